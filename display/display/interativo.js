@@ -0,0 +1,141 @@
+// Painel interativo: busca as contagens no servidor local
+// (python -m acidentes servidor) e desenha os gráficos de barras em SVG.
+// O navegador revalida as respostas pelo ETag, então repetir um filtro já
+// visto não consulta o banco de novo.
+const CORES = ['purple', 'pink', 'skyblue', 'orange', 'green'];
+const SVG = 'http://www.w3.org/2000/svg';
+const nomes = {};
+
+async function buscar(caminho, parametros) {
+    const resposta = await fetch(`${caminho}?${new URLSearchParams(parametros)}`);
+    const dados = await resposta.json();
+    if (!resposta.ok) {
+        throw new Error(dados.erro);
+    }
+    return dados;
+}
+
+// Formato 'split' do pandas -> lista de objetos
+function linhas(tabela) {
+    return tabela.data.map(linha => Object.fromEntries(tabela.columns.map((coluna, i) => [coluna, linha[i]])));
+}
+
+function elemento(nome, atributos, texto) {
+    const el = document.createElementNS(SVG, nome);
+    Object.entries(atributos).forEach(([chave, valor]) => el.setAttribute(chave, valor));
+    if (texto !== undefined) {
+        el.textContent = texto;
+    }
+    return el;
+}
+
+// Barras agrupadas: uma por série (ano) em cada categoria
+function barras(titulo, categorias, series) {
+    const largura = Math.max(600, categorias.length * (series.length * 18 + 20) + 80);
+    const altura = 360, margem = {esquerda: 60, baixo: 110, topo: 20};
+    const maximo = Math.max(1, ...series.flatMap(serie => serie.valores));
+    const escala = valor => (altura - margem.baixo - margem.topo) * valor / maximo;
+    const passo = (largura - margem.esquerda) / categorias.length;
+    const barra = Math.min(40, (passo - 10) / series.length);
+
+    const svg = elemento('svg', {viewBox: `0 0 ${largura} ${altura}`, width: '100%'});
+    for (let i = 0; i <= 4; i++) {
+        const valor = maximo * i / 4, y = altura - margem.baixo - escala(valor);
+        svg.append(elemento('line', {x1: margem.esquerda, x2: largura, y1: y, y2: y, stroke: '#ccc', 'stroke-dasharray': '4'}));
+        svg.append(elemento('text', {x: margem.esquerda - 6, y: y + 4, 'text-anchor': 'end', 'font-size': 11}, Math.round(valor)));
+    }
+    categorias.forEach((categoria, c) => {
+        const x = margem.esquerda + c * passo + (passo - barra * series.length) / 2;
+        series.forEach((serie, s) => {
+            const h = escala(serie.valores[c]);
+            const retangulo = elemento('rect', {x: x + s * barra, y: altura - margem.baixo - h, width: barra - 2, height: h, fill: CORES[s % CORES.length], opacity: 0.8});
+            retangulo.append(elemento('title', {}, `${serie.nome}: ${serie.valores[c]}`));
+            svg.append(retangulo);
+        });
+        const rotulo = elemento('text', {'font-size': 11, 'text-anchor': 'end', transform: `translate(${x + barra * series.length / 2}, ${altura - margem.baixo + 14}) rotate(-40)`}, categoria);
+        svg.append(rotulo);
+    });
+    series.forEach((serie, s) => {
+        svg.append(elemento('rect', {x: largura - 90, y: margem.topo + s * 18, width: 12, height: 12, fill: CORES[s % CORES.length]}));
+        svg.append(elemento('text', {x: largura - 72, y: margem.topo + s * 18 + 11, 'font-size': 12}, serie.nome));
+    });
+
+    const container = document.createElement('div');
+    container.className = 'container';
+    const cabecalho = document.createElement('span');
+    cabecalho.textContent = titulo;
+    container.append(cabecalho, svg);
+    return container;
+}
+
+function nomeMunicipio(codigo) {
+    return nomes[codigo] || String(codigo);
+}
+
+// Contagens em formato longo -> categorias x anos
+function series(registros, coluna, anos) {
+    const categorias = [...new Set(registros.map(r => r[coluna]))].sort();
+    return {
+        categorias,
+        series: anos.map(ano => ({
+            nome: String(ano),
+            valores: categorias.map(categoria => registros
+                .filter(r => r.NU_ANO === ano && r[coluna] === categoria)
+                .reduce((soma, r) => soma + r.QTD, 0)),
+        })),
+    };
+}
+
+async function atualizar(evento) {
+    if (evento) {
+        evento.preventDefault();
+    }
+    const formulario = new FormData(document.getElementById('filtros'));
+    const anos = formulario.getAll('ano').map(Number);
+    const parametros = {anos: anos.join(',')};
+    ['uf', 'municipios'].forEach(nome => {
+        if (formulario.get(nome)) {
+            parametros[nome] = formulario.get(nome).replace(/\s+/g, '');
+        }
+    });
+    const dimensao = formulario.get('dimensao');
+    parametros.dimensoes = dimensao ? `ID_MUNICIP,${dimensao}` : 'ID_MUNICIP';
+
+    const status = document.getElementById('status');
+    const graficos = document.getElementById('graficos');
+    status.textContent = 'Consultando...';
+    try {
+        const inicio = performance.now();
+        const municipios = await buscar('/api/municipios', parametros);
+        municipios.forEach(m => { nomes[m.codigo] = m.nome; });
+        const registros = linhas(await buscar('/api/contagens', parametros));
+        graficos.replaceChildren();
+        if (!dimensao) {
+            const dados = series(registros.map(r => ({...r, MUNICIPIO: nomeMunicipio(r.ID_MUNICIP)})), 'MUNICIPIO', anos);
+            graficos.append(barras(`Acidentes de trabalho por município (${anos.join(' vs ')})`, dados.categorias, dados.series));
+        } else {
+            // um gráfico por município, dos que têm mais acidentes para os que têm menos (até 20)
+            municipios.sort((a, b) => b.qtd - a.qtd).slice(0, 20).forEach(m => {
+                const dados = series(registros.filter(r => r.ID_MUNICIP === m.codigo), dimensao, anos);
+                graficos.append(barras(`${m.nome} (${anos.join(' vs ')})`, dados.categorias, dados.series));
+            });
+        }
+        status.textContent = `${registros.length} linhas em ${Math.round(performance.now() - inicio)} ms`;
+    } catch (erro) {
+        status.textContent = `Erro: ${erro.message}`;
+    }
+}
+
+async function iniciar() {
+    const anos = await buscar('/api/anos', {});
+    const campo = document.getElementById('anos');
+    anos.forEach(ano => {
+        const rotulo = document.createElement('label');
+        rotulo.innerHTML = `<input type="checkbox" name="ano" value="${ano}" checked> ${ano}`;
+        campo.append(rotulo);
+    });
+    document.getElementById('filtros').addEventListener('submit', atualizar);
+    atualizar();
+}
+
+iniciar();
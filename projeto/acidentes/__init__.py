@@ -0,0 +1 @@
+# Funções compartilhadas pelas análises de acidentes de trabalho (DATASUS).
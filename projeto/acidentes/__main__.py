@@ -0,0 +1,3 @@
+from acidentes.cli import main
+
+main()
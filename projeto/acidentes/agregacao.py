@@ -0,0 +1,287 @@
+import math
+
+from acidentes import cache_consultas
+from acidentes.categorias import faixas_etarias, sql_faixa_etaria, sql_tipo_acidente, texto_sql, tipos_acidentes
+from acidentes.ocupacoes import OCUPACOES
+
+TABELA = 'dadosacidentetrabalho'
+CUBO = 'cubo_acidentes'
+
+# Expressão SQL de cada dimensão que pode ser usada no GROUP BY
+DIMENSOES = {
+    'NU_ANO': 'NU_ANO',
+    'ID_MUNICIP': 'ID_MUNICIP',
+    'FAIXA_ETARIA': sql_faixa_etaria('NU_IDADE_N'),
+    'TIPO_ACIDENTE': sql_tipo_acidente('CID_ACID'),
+    'ID_OCUPA_N': 'ID_OCUPA_N',
+}
+
+# Dimensões que vêm da tabela de ocupações (ocupacoes.py), ligada por JOIN
+# dentro da consulta em qualquer fonte
+DIMENSOES_OCUPACAO = {
+    'CARGO': f'{OCUPACOES}.DESCRICAO',
+}
+JUNCAO_OCUPACAO = f'LEFT JOIN {OCUPACOES} ON {OCUPACOES}.CODIGO = TRIM(CAST(ID_OCUPA_N AS VARCHAR))'
+
+# Modo aproximado (ativar_amostra); None quando desligado
+_amostra = None
+
+
+# De onde as contagens são lidas: a tabela bruta (uma linha por acidente) ou
+# o cubo pré-agregado de cubo.py (uma linha por combinação das dimensões)
+def _fonte(fonte):
+    if fonte == 'bruto':
+        return TABELA, {**DIMENSOES, **DIMENSOES_OCUPACAO}, 'COUNT(*)'
+    if fonte == 'cubo':
+        return CUBO, {**{d: d for d in DIMENSOES}, **DIMENSOES_OCUPACAO}, 'CAST(SUM(QTD) AS BIGINT)'
+    raise ValueError(f"Fonte desconhecida: {fonte!r} (use 'bruto' ou 'cubo')")
+
+
+# O resultado sai do DuckDB em Arrow e vira DataFrame sem copiar as colunas
+# numéricas sem nulos nem as de texto (que no pandas também ficam em Arrow);
+# split_blocks evita juntar as colunas num bloco só, o que forçaria uma cópia
+def _para_pandas(dados):
+    return dados.to_pandas(split_blocks=True, self_destruct=True)
+
+
+# Todas as leituras passam por aqui; com o cache de consultas ativo
+# (cache_consultas.ativar), resultados de um banco inalterado vêm do disco
+def consultar(conn, query, parametros):
+    return cache_consultas.consultar(
+        conn, query, parametros, lambda: _para_pandas(conn.execute(query, parametros).to_arrow_table())
+    )
+
+
+# Para resultados grandes: um DataFrame por lote de até linhas_por_lote
+# linhas, sem montar o resultado inteiro na memória. Não passa pelo cache, e
+# os lotes devem ser consumidos antes de usar a conexão para outra consulta.
+def consultar_em_lotes(conn, query, parametros, linhas_por_lote=1_000_000):
+    for lote in conn.execute(query, parametros).to_arrow_reader(linhas_por_lote):
+        yield _para_pandas(lote)
+
+
+# Modo aproximado, para explorar tabelas grandes: as contagens da tabela bruta
+# passam a ler só uma amostra de `taxa` das linhas (ex.: 0.01) e são
+# multiplicadas por 1 / taxa. Os resultados ganham as colunas QTD_ERRO (erro
+# padrão da estimativa) e QTD_MAX (limite superior do intervalo de 95%), e
+# attrs['aproximado'] = True. 'bernoulli' sorteia linha a linha, e o erro vale
+# para qualquer ordem da tabela. 'system' sorteia blocos inteiros de ~2 mil
+# linhas e pula a leitura dos demais: é bem mais rápido, mas a estimativa varia
+# com a quantidade de blocos sorteados (com 1% de 2 milhões de linhas, uns 10
+# blocos), o que a amostra não permite medir; com ele, QTD_ERRO e QTD_MAX
+# ficam vazios. A semente torna a amostra repetível (e o resultado, cacheável).
+def ativar_amostra(taxa, metodo='bernoulli', semente=0):
+    global _amostra
+    if not 0 < taxa <= 1:
+        raise ValueError(f'Taxa de amostragem inválida: {taxa} (use um valor entre 0 e 1, ex.: 0.01)')
+    if metodo not in ('system', 'bernoulli'):
+        raise ValueError(f"Método de amostragem desconhecido: {metodo!r} (use 'system' ou 'bernoulli')")
+    _amostra = {'taxa': taxa, 'metodo': metodo, 'semente': semente}
+
+
+def desativar_amostra():
+    global _amostra
+    _amostra = None
+
+
+# Configuração do modo aproximado, ou None no modo exato
+def amostra_ativa():
+    return dict(_amostra) if _amostra else None
+
+
+# Erro padrão de uma tabela de contagens estimadas no modo aproximado (por
+# exemplo, a de contar_por_municipio), com a mesma forma; zero no modo exato
+# e vazio (NaN) com o método 'system'
+def erro_amostra(tabela):
+    taxa = tabela.attrs.get('amostra', 1)
+    if tabela.attrs.get('metodo') == 'system':
+        return tabela * math.nan
+    return (tabela * (1 - taxa) / taxa) ** 0.5
+
+
+# Marca o resultado como exato ou aproximado (e com qual taxa)
+def _marcar(resultado, origem=None):
+    if origem is not None:
+        resultado.attrs.update(origem.attrs)
+    else:
+        resultado.attrs['aproximado'] = _amostra is not None
+        if _amostra is not None:
+            resultado.attrs['amostra'] = _amostra['taxa']
+            resultado.attrs['metodo'] = _amostra['metodo']
+    return resultado
+
+
+# Marcadores de parâmetro (?, ?, ...) para um IN com os valores
+def marcadores(valores):
+    return ', '.join('?' for _ in valores)
+
+
+# Monta o WHERE com parâmetros: anos é obrigatório; municipios (códigos IBGE)
+# e uf (ex.: 43 para o RS) são opcionais e, se omitidos, não filtram nada
+def _filtro(anos, municipios=None, uf=None):
+    anos = list(anos)
+    condicoes = [f'NU_ANO IN ({marcadores(anos)})']
+    parametros = anos
+    if municipios is not None:
+        municipios = list(municipios)
+        condicoes.append(f'ID_MUNICIP IN ({marcadores(municipios)})')
+        parametros += municipios
+    if uf is not None:
+        # faixa de códigos da UF, e não ID_MUNICIP // 10000 = uf, para que o
+        # filtro descarte partições (parquet.py) e blocos do banco pelo mín./máx.
+        condicoes.append('ID_MUNICIP BETWEEN ? AND ?')
+        parametros += [uf * 10000, uf * 10000 + 9999]
+    return ' AND '.join(condicoes), parametros
+
+
+# Valores que cada dimensão pode ter no modo aproximado, para que os grupos
+# que não aparecem na amostra saiam com QTD 0 (e o seu limite superior) em vez
+# de sumir: os anos e municípios pedidos e todas as faixas e tipos. Dimensões
+# sem lista conhecida (municípios de uma UF, ocupações) ficam com os valores
+# vistos na amostra.
+def _dominio(dimensao, anos, municipios):
+    if dimensao == 'NU_ANO':
+        valores, tipo = [str(int(ano)) for ano in anos], 'SMALLINT'
+    elif dimensao == 'ID_MUNICIP' and municipios is not None:
+        valores, tipo = [str(int(municipio)) for municipio in municipios], 'INTEGER'
+    elif dimensao == 'FAIXA_ETARIA':
+        valores, tipo = [texto_sql(rotulo) for rotulo, _ in faixas_etarias], 'VARCHAR'
+    elif dimensao == 'TIPO_ACIDENTE':
+        valores, tipo = [texto_sql(tipo) for tipo in dict.fromkeys([*tipos_acidentes.values(), 'Outros'])], 'VARCHAR'
+    else:
+        return f'(SELECT DISTINCT {dimensao} FROM amostra)'
+    return f"(SELECT CAST(UNNEST([{', '.join(valores)}]) AS {tipo}) AS {dimensao})"
+
+
+# Conta os acidentes agrupando por ano e pelas dimensões pedidas dentro do
+# DuckDB, numa única consulta para todos os anos e municípios. Só a tabela de
+# contagens (uma linha por grupo, coluna QTD) vai para o pandas.
+# Linhas com alguma dimensão ausente ficam de fora, como no groupby do pandas.
+def _sql_contagem(dimensoes, anos, municipios, uf, fonte):
+    tabela, expressoes, medida = _fonte(fonte)
+    dimensoes = ['NU_ANO', *dimensoes]
+    colunas = ', '.join(f'{expressoes[d]} AS {d}' for d in dimensoes)
+    presentes = ''.join(f' AND {expressoes[d]} IS NOT NULL' for d in dimensoes)
+    juncao = JUNCAO_OCUPACAO if any(d in DIMENSOES_OCUPACAO for d in dimensoes) else ''
+    filtro, parametros = _filtro(anos, municipios, uf)
+    if _amostra is None:
+        query = f"""
+        SELECT {colunas}, {medida} AS QTD
+        FROM {tabela} {juncao}
+        WHERE {filtro}{presentes}
+        GROUP BY ALL
+        """
+        return query, parametros
+
+    if fonte != 'bruto':
+        raise ValueError(f"O modo aproximado só lê a tabela bruta (fonte 'bruto'), não {fonte!r}")
+    taxa = _amostra['taxa']
+    if _amostra['metodo'] == 'bernoulli':
+        # com N linhas na amostra, N * (1 - taxa) é a variância da contagem
+        # amostrada; sem linhas, o limite é o maior total que ainda teria 2,5%
+        # de chance de não aparecer: (1 - taxa) ** total = 0.025
+        sem_linhas = math.log(0.025) / math.log1p(-taxa) if taxa < 1 else 0
+        erro = f'SQRT(COALESCE(N, 0) * {1 - taxa}) / {taxa}'
+        maximo = f'CASE WHEN N IS NULL THEN {sem_linhas} ELSE (N + 1.96 * SQRT(N * {1 - taxa})) / {taxa} END'
+    else:
+        erro = maximo = 'CAST(NULL AS DOUBLE)'
+    grade = ' CROSS JOIN '.join(_dominio(d, anos, municipios) for d in dimensoes)
+    query = f"""
+    WITH amostra AS (
+        SELECT {colunas}, COUNT(*) AS N
+        FROM {tabela} TABLESAMPLE {taxa * 100}% ({_amostra['metodo']}, {int(_amostra['semente'])}) {juncao}
+        WHERE {filtro}{presentes}
+        GROUP BY ALL
+    )
+    SELECT {', '.join(dimensoes)}, CAST(ROUND(COALESCE(N, 0) / {taxa}) AS BIGINT) AS QTD,
+        {erro} AS QTD_ERRO, {maximo} AS QTD_MAX
+    FROM {grade} LEFT JOIN amostra USING ({', '.join(dimensoes)})
+    """
+    return query, parametros
+
+
+def contar(conn, dimensoes, anos, municipios=None, uf=None, fonte='bruto'):
+    query, parametros = _sql_contagem(dimensoes, anos, municipios, uf, fonte)
+    return _marcar(consultar(conn, query + ' ORDER BY ALL', parametros))
+
+
+# Como contar(), mas em lotes (consultar_em_lotes)
+def contar_em_lotes(conn, dimensoes, anos, municipios=None, uf=None, fonte='bruto', linhas_por_lote=1_000_000):
+    query, parametros = _sql_contagem(dimensoes, anos, municipios, uf, fonte)
+    return (_marcar(lote) for lote in consultar_em_lotes(conn, query + ' ORDER BY ALL', parametros, linhas_por_lote))
+
+
+# Tabela (ano, município) x coluna com as contagens, no formato do
+# groupby().size().unstack()
+def _tabela_cruzada(conn, coluna, anos, municipios, uf, fonte):
+    contagem = contar(conn, ['ID_MUNICIP', coluna], anos, municipios, uf, fonte)
+    return _marcar(contagem.set_index(['NU_ANO', 'ID_MUNICIP', coluna])['QTD'].unstack(fill_value=0), contagem)
+
+
+# Municípios nas linhas e anos nas colunas
+def contar_por_municipio(conn, anos, municipios=None, uf=None, fonte='bruto'):
+    contagem = contar(conn, ['ID_MUNICIP'], anos, municipios, uf, fonte)
+    return _marcar(contagem.set_index(['ID_MUNICIP', 'NU_ANO'])['QTD'].unstack(fill_value=0), contagem)
+
+
+def contar_por_faixa_etaria(conn, anos, municipios=None, uf=None, fonte='bruto'):
+    return _tabela_cruzada(conn, 'FAIXA_ETARIA', anos, municipios, uf, fonte)
+
+
+def contar_por_tipo_acidente(conn, anos, municipios=None, uf=None, fonte='bruto'):
+    return _tabela_cruzada(conn, 'TIPO_ACIDENTE', anos, municipios, uf, fonte)
+
+
+# Contagens por ano, município e ocupação (coluna CARGO, com a descrição da
+# ocupação), em formato longo (há milhares de ocupações)
+def contar_por_cargo(conn, anos, municipios=None, uf=None, fonte='bruto'):
+    return contar(conn, ['ID_MUNICIP', 'CARGO'], anos, municipios, uf, fonte)
+
+
+def contar_por_cargo_e_faixa_etaria(conn, anos, municipios=None, uf=None, fonte='bruto'):
+    return contar(conn, ['ID_MUNICIP', 'CARGO', 'FAIXA_ETARIA'], anos, municipios, uf, fonte)
+
+
+# As n categorias de `dimensao` com mais acidentes em cada grupo (cada
+# combinação das dimensões em `grupos`), numa única consulta: o ranking é
+# feito no banco com uma função de janela, então só as linhas do top vão para
+# o pandas. `detalhes` são dimensões que aparecem no resultado sem separar o
+# ranking (a posição de cada categoria é pela soma delas e dos anos que não
+# estão em `grupos`). Formato longo, com NU_ANO, os grupos, a dimensão, os
+# detalhes e QTD, ordenado pelos grupos e pela posição no ranking. No modo
+# aproximado, categorias que não aparecem na amostra não entram no ranking.
+def top_n(conn, dimensao, grupos, anos, municipios=None, uf=None, n=10, fonte='bruto', detalhes=()):
+    chaves = [*grupos, dimensao]
+    dimensoes = [d for d in dict.fromkeys([*chaves, *detalhes]) if d != 'NU_ANO']
+    query, parametros = _sql_contagem(dimensoes, anos, municipios, uf, fonte)
+    particao = f"PARTITION BY {', '.join(grupos)}" if grupos else ''
+    ordem = ', '.join([*(f'contagem.{g}' for g in grupos), 'POSICAO', *(f'contagem.{d}' for d in ['NU_ANO', *detalhes])])
+    query = f"""
+    WITH contagem AS ({query}),
+    ranking AS (
+        SELECT {', '.join(chaves)}, ROW_NUMBER() OVER ({particao} ORDER BY SUM(QTD) DESC, {dimensao}) AS POSICAO
+        FROM contagem
+        GROUP BY {', '.join(chaves)}
+        HAVING SUM(QTD) > 0
+        QUALIFY POSICAO <= ?
+    )
+    SELECT contagem.* FROM contagem JOIN ranking USING ({', '.join(chaves)})
+    ORDER BY {ordem}
+    """
+    return _marcar(consultar(conn, query, [*parametros, n]))
+
+
+# As n ocupações (já com a descrição) com mais acidentes em cada ano
+def top_cargos(conn, anos, municipios=None, uf=None, n=10, fonte='bruto'):
+    return top_n(conn, 'CARGO', ['NU_ANO'], anos, municipios, uf, n, fonte)
+
+
+# As n ocupações com mais acidentes em cada município e ano
+def top_cargos_por_municipio(conn, anos, municipios=None, uf=None, n=5, fonte='bruto'):
+    return top_n(conn, 'CARGO', ['ID_MUNICIP', 'NU_ANO'], anos, municipios, uf, n, fonte)
+
+
+# As n ocupações com mais acidentes em cada município (somando os anos), com
+# as contagens por ano e faixa etária
+def top_cargos_por_faixa_etaria(conn, anos, municipios=None, uf=None, n=5, fonte='bruto'):
+    return top_n(conn, 'CARGO', ['ID_MUNICIP'], anos, municipios, uf, n, fonte, detalhes=['FAIXA_ETARIA'])
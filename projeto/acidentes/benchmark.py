@@ -0,0 +1,155 @@
+# Benchmark por etapa do processamento, sobre dados sintéticos (sinteticos.py)
+# gerados numa pasta temporária: o banco e os CSVs do projeto não são tocados.
+# Cada etapa é cronometrada separadamente (melhor e mediana de várias
+# repetições) e roda mais uma vez com o tracemalloc para medir o pico de memória
+# alocada pelo Python, pandas e NumPy (a memória interna do DuckDB e a dos
+# processos de renderização não entram nessa conta).
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import duckdb
+
+from acidentes import ingestao
+from acidentes.agregacao import (
+    TABELA,
+    contar_por_cargo,
+    contar_por_faixa_etaria,
+    contar_por_municipio,
+    contar_por_tipo_acidente,
+)
+from acidentes.categorias import municipios_nome, texto_sql
+from acidentes.classificacao import classificar_acidentes
+from acidentes.cubo import atualizar_cubo
+from acidentes.idade import atribuir_faixas, decodificar_idade
+from acidentes.ocupacoes import carregar_ocupacoes
+from acidentes.referencia import carregar_referencia
+from acidentes.relatorios import RELATORIOS
+from acidentes.renderizacao import renderizar
+from acidentes.sinteticos import gerar_csv, gerar_referencia
+
+ETAPAS = ['carga_csv', 'carga_banco', 'idade', 'classificacao', 'juncao_ocupacoes', 'agregacao', 'cubo', 'renderizacao']
+
+
+def medir(funcao, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'tempo_min': min(tempos), 'tempo_mediano': statistics.median(tempos), 'memoria_pico': pico}
+
+
+def _carga_csv(arquivos):
+    # sem a cópia em memória de ingestao, senão só a primeira leitura contaria
+    ingestao.esquecer_copias()
+    return ingestao.carregar_anos(arquivos)
+
+
+def _carga_banco(conn, arquivos):
+    lista = ', '.join(texto_sql(caminho) for caminho in arquivos.values())
+    conn.execute(f'CREATE OR REPLACE TABLE {TABELA} AS SELECT * FROM read_csv([{lista}])')
+
+
+def _idade(csvs):
+    for dados in csvs.values():
+        atribuir_faixas(decodificar_idade(dados['NU_IDADE_N']))
+
+
+def _classificacao(csvs):
+    for dados in csvs.values():
+        classificar_acidentes(dados['CID_ACID'])
+
+
+def _juncao_ocupacoes(conn, anos, caminho_ocupacoes):
+    carregar_ocupacoes(conn, caminho_ocupacoes, recarregar=True)
+    contar_por_cargo(conn, anos)
+
+
+# Contagens nacionais (sem filtro de município) direto da tabela bruta
+def _agregacao(conn, anos):
+    contar_por_municipio(conn, anos)
+    contar_por_faixa_etaria(conn, anos)
+    contar_por_tipo_acidente(conn, anos)
+
+
+# Cada repetição renderiza numa pasta nova, para não aproveitar o cache
+def _renderizacao(graficos, pasta):
+    renderizar(graficos, tempfile.mkdtemp(dir=pasta))
+
+
+# Gera `linhas` registros sintéticos e mede as etapas pedidas (todas, por
+# padrão). Devolve um dicionário pronto para ser gravado em JSON.
+def executar_benchmark(linhas=100_000, anos=(2022, 2023), caminho_ocupacoes='./OCUPANET.csv',
+                       etapas=ETAPAS, repeticoes=3, semente=0, progresso=print):
+    anos = list(anos)
+    resultado = {'linhas': linhas, 'anos': anos, 'repeticoes': repeticoes, 'etapas': {}}
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivos = gerar_csv(os.path.join(pasta, 'ACGRBR{ano}.csv'), linhas, anos, caminho_ocupacoes, semente)
+        conn = duckdb.connect(os.path.join(pasta, 'benchmark.db'))
+        try:
+            # as etapas seguintes usam os dados já carregados
+            csvs = _carga_csv(arquivos)
+            _carga_banco(conn, arquivos)
+            carregar_ocupacoes(conn, caminho_ocupacoes)
+            carregar_referencia(conn, gerar_referencia(os.path.join(pasta, 'referencia.csv'), semente))
+            graficos = []
+            if 'renderizacao' in etapas:
+                for relatorio in RELATORIOS.values():
+                    graficos += relatorio(conn, anos, list(municipios_nome))
+
+            funcoes = {
+                'carga_csv': lambda: _carga_csv(arquivos),
+                'carga_banco': lambda: _carga_banco(conn, arquivos),
+                'idade': lambda: _idade(csvs),
+                'classificacao': lambda: _classificacao(csvs),
+                'juncao_ocupacoes': lambda: _juncao_ocupacoes(conn, anos, caminho_ocupacoes),
+                'agregacao': lambda: _agregacao(conn, anos),
+                'cubo': lambda: atualizar_cubo(conn, forcar=True),
+                'renderizacao': lambda: _renderizacao(graficos, pasta),
+            }
+            for etapa in etapas:
+                resultado['etapas'][etapa] = medir(funcoes[etapa], repeticoes)
+                if progresso:
+                    progresso(formatar_etapa(etapa, resultado['etapas'][etapa]))
+        finally:
+            conn.close()
+    return resultado
+
+
+def formatar_etapa(etapa, medida):
+    return (f"{etapa:<18} {medida['tempo_min']:9.3f} s (mediana {medida['tempo_mediano']:.3f} s)"
+            f" {medida['memoria_pico'] / 2**20:10.1f} MiB")
+
+
+# Etapas cujo melhor tempo piorou mais que `tolerancia` (fração) em relação a
+# um resultado anterior com o mesmo número de linhas: {etapa: (antes, agora)}
+def comparar(atual, base, tolerancia=0.2):
+    if atual['linhas'] != base['linhas']:
+        raise ValueError(f"Resultados com tamanhos diferentes: {atual['linhas']} e {base['linhas']} linhas")
+    regressoes = {}
+    for etapa, medida in atual['etapas'].items():
+        anterior = base['etapas'].get(etapa)
+        if anterior and medida['tempo_min'] > anterior['tempo_min'] * (1 + tolerancia):
+            regressoes[etapa] = (anterior['tempo_min'], medida['tempo_min'])
+    return regressoes
+
+
+def gravar_resultado(resultado, caminho):
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, indent=2)
+
+
+def ler_resultado(caminho):
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
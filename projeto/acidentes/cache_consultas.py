@@ -0,0 +1,148 @@
+# Cache em disco dos resultados das consultas de agregacao.py. A chave é a
+# consulta normalizada (espaços colapsados), os parâmetros e o estado do
+# arquivo do banco (caminho, data de modificação e tamanho do .db e do .wal),
+# então qualquer gravação no banco invalida as entradas antigas sem precisar
+# consultá-lo. Bancos em memória não usam o cache.
+#
+# As entradas ficam em pasta/<chave>.pkl e o índice (tamanho e último uso de
+# cada entrada, mais os acertos e falhas acumulados) em pasta/indice.json.
+# Quando o total passa de `limite` bytes, as entradas usadas há mais tempo são
+# removidas.
+import hashlib
+import json
+import os
+import re
+import time
+
+import pandas as pd
+
+INDICE = 'indice.json'
+
+# Cache ativo; None quando desligado (as consultas vão sempre ao banco)
+_cache = None
+
+
+def _ler_indice(pasta):
+    try:
+        with open(os.path.join(pasta, INDICE), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'entradas': {}, 'acertos': 0, 'falhas': 0}
+
+
+def _gravar_indice(pasta, indice):
+    caminho = os.path.join(pasta, INDICE)
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as arquivo:
+        json.dump(indice, arquivo, indent=2)
+    os.replace(caminho + '.tmp', caminho)
+
+
+def ativar(pasta='.cache_consultas', limite=256 * 2**20):
+    global _cache
+    os.makedirs(pasta, exist_ok=True)
+    _cache = {'pasta': pasta, 'limite': limite, 'indice': _ler_indice(pasta), 'acertos': 0, 'falhas': 0}
+
+
+def desativar():
+    global _cache
+    _cache = None
+
+
+# Acertos e falhas da execução atual e acumulados, quantidade de entradas e bytes em disco
+def estatisticas():
+    if _cache is None:
+        return None
+    indice = _cache['indice']
+    return {
+        'acertos': _cache['acertos'],
+        'falhas': _cache['falhas'],
+        'acertos_total': indice['acertos'],
+        'falhas_total': indice['falhas'],
+        'entradas': len(indice['entradas']),
+        'bytes': sum(entrada['tamanho'] for entrada in indice['entradas'].values()),
+    }
+
+
+def limpar():
+    for chave in list(_cache['indice']['entradas']):
+        _remover(chave)
+    _gravar_indice(_cache['pasta'], _cache['indice'])
+
+
+def _arquivo(chave):
+    return os.path.join(_cache['pasta'], f'{chave}.pkl')
+
+
+def _remover(chave):
+    _cache['indice']['entradas'].pop(chave)
+    try:
+        os.remove(_arquivo(chave))
+    except FileNotFoundError:
+        pass
+
+
+# Estado do arquivo do banco da conexão; None para bancos em memória
+def estado_banco(conn):
+    caminho = conn.execute(
+        'SELECT path FROM duckdb_databases() WHERE database_name = current_database()'
+    ).fetchone()[0]
+    if not caminho:
+        return None
+    estado = [os.path.abspath(caminho)]
+    for arquivo in (caminho, caminho + '.wal'):
+        try:
+            info = os.stat(arquivo)
+            estado += [info.st_mtime_ns, info.st_size]
+        except FileNotFoundError:
+            estado += [None, None]
+    return estado
+
+
+def _chave(query, parametros, estado):
+    normalizada = re.sub(r'\s+', ' ', query).strip()
+    conteudo = json.dumps([normalizada, list(parametros), estado], default=str)
+    return hashlib.sha256(conteudo.encode()).hexdigest()
+
+
+def _evictar():
+    entradas = _cache['indice']['entradas']
+    total = sum(entrada['tamanho'] for entrada in entradas.values())
+    for chave in sorted(entradas, key=lambda c: entradas[c]['ultimo_uso']):
+        if total <= _cache['limite']:
+            break
+        total -= entradas[chave]['tamanho']
+        _remover(chave)
+
+
+# Devolve o resultado da consulta, do cache se houver uma entrada para a
+# mesma consulta com o banco no mesmo estado; senão chama executar() e guarda
+def consultar(conn, query, parametros, executar):
+    if _cache is None:
+        return executar()
+    estado = estado_banco(conn)
+    if estado is None:
+        return executar()
+
+    chave = _chave(query, parametros, estado)
+    indice = _cache['indice']
+    entrada = indice['entradas'].get(chave)
+    if entrada is not None:
+        try:
+            resultado = pd.read_pickle(_arquivo(chave))
+        except (FileNotFoundError, EOFError):
+            _remover(chave)
+        else:
+            entrada['ultimo_uso'] = time.time()
+            _cache['acertos'] += 1
+            indice['acertos'] += 1
+            _gravar_indice(_cache['pasta'], indice)
+            return resultado
+
+    resultado = executar()
+    resultado.to_pickle(_arquivo(chave))
+    indice['entradas'][chave] = {'tamanho': os.path.getsize(_arquivo(chave)), 'ultimo_uso': time.time()}
+    _cache['falhas'] += 1
+    indice['falhas'] += 1
+    _evictar()
+    _gravar_indice(_cache['pasta'], indice)
+    return resultado
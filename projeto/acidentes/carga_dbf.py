@@ -0,0 +1,128 @@
+import itertools
+import os
+
+import pandas as pd
+from dbfread import DBF
+
+from acidentes.agregacao import TABELA
+
+CONTROLE = 'carga_dbf_controle'
+
+# Tipos fixos das colunas usadas pelas análises; as demais seguem o tipo do campo no DBF
+TIPOS_CONHECIDOS = {
+    'NU_ANO': 'SMALLINT',
+    'ID_MUNICIP': 'INTEGER',
+    'NU_IDADE_N': 'SMALLINT',
+    'CID_ACID': 'VARCHAR',
+    'ID_OCUPA_N': 'VARCHAR',
+}
+
+
+def _tipo_sql(campo):
+    if campo.name in TIPOS_CONHECIDOS:
+        return TIPOS_CONHECIDOS[campo.name]
+    if campo.type == 'N':
+        return 'BIGINT' if campo.decimal_count == 0 else 'DOUBLE'
+    if campo.type == 'F':
+        return 'DOUBLE'
+    if campo.type == 'D':
+        return 'DATE'
+    if campo.type == 'L':
+        return 'BOOLEAN'
+    return 'VARCHAR'
+
+
+# Converte o texto lido do DBF para o tipo da coluna; valores vazios ou
+# inválidos viram NULL em vez de interromper a carga
+def _converter(coluna, tipo):
+    valor = f"NULLIF(TRIM({coluna}), '')"
+    if tipo == 'DATE':
+        return f"CAST(TRY_STRPTIME({valor}, '%Y%m%d') AS DATE)"
+    return f'TRY_CAST({valor} AS {tipo})'
+
+
+def _preparar_tabelas(conn, tabela):
+    colunas = ', '.join(f'{campo.name} {_tipo_sql(campo)}' for campo in tabela.fields)
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {TABELA} ({colunas})')
+    conn.execute(f"""
+    CREATE TABLE IF NOT EXISTS {CONTROLE} (
+        ARQUIVO VARCHAR PRIMARY KEY,
+        TAMANHO BIGINT,
+        REGISTROS BIGINT,
+        CONCLUIDO BOOLEAN
+    )
+    """)
+    return dict(conn.execute(
+        'SELECT column_name, data_type FROM information_schema.columns WHERE table_name = ?', [TABELA]
+    ).fetchall())
+
+
+def _inserir_lote(conn, lote, campos, tipos, arquivo):
+    dados = pd.DataFrame(lote, columns=campos)
+    colunas = ', '.join(campo for campo in campos if campo in tipos)
+    conversoes = ', '.join(_converter(campo, tipos[campo]) for campo in campos if campo in tipos)
+    conn.register('lote_dbf', dados)
+    conn.begin()
+    try:
+        conn.execute(f'INSERT INTO {TABELA} ({colunas}) SELECT {conversoes} FROM lote_dbf')
+        conn.execute(f'UPDATE {CONTROLE} SET REGISTROS = REGISTROS + ? WHERE ARQUIVO = ?', [len(lote), arquivo])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.unregister('lote_dbf')
+
+
+def _mostrar_progresso(arquivo, registros, total):
+    print(f'{arquivo}: {registros}/{total} registros ({100 * registros / max(total, 1):.1f}%)')
+
+
+# Lê um arquivo DBF do DATASUS registro a registro e grava em
+# dadosacidentetrabalho em lotes de tamanho_lote, sem passar por CSV. A memória
+# usada é limitada ao lote. Cada lote é gravado junto com o total de registros
+# já carregados do arquivo; se a carga for interrompida, chamar de novo continua
+# do último lote gravado. Arquivos já concluídos são ignorados.
+def carregar_dbf(conn, caminho, tamanho_lote=50_000, encoding='latin-1', progresso=_mostrar_progresso):
+    arquivo = os.path.basename(caminho)
+    tamanho = os.path.getsize(caminho)
+    tabela = DBF(caminho, encoding=encoding, raw=True,
+                 recfactory=lambda itens: [valor.decode(encoding, 'replace') for _, valor in itens])
+    tipos = _preparar_tabelas(conn, tabela)
+
+    registro = conn.execute(f'SELECT TAMANHO, REGISTROS, CONCLUIDO FROM {CONTROLE} WHERE ARQUIVO = ?', [arquivo]).fetchone()
+    if registro is None:
+        conn.execute(f'INSERT INTO {CONTROLE} VALUES (?, ?, 0, false)', [arquivo, tamanho])
+        ja_carregados, concluido = 0, False
+    else:
+        tamanho_anterior, ja_carregados, concluido = registro
+        if tamanho_anterior != tamanho:
+            raise ValueError(
+                f'{arquivo} mudou desde a carga anterior ({tamanho_anterior} -> {tamanho} bytes); '
+                f'remova os registros já carregados e a linha de {CONTROLE} antes de recarregar.'
+            )
+    if concluido:
+        return 0
+
+    campos = tabela.field_names
+    # registros ativos: o numrecords do cabeçalho conta também os apagados,
+    # que a leitura pula (a contagem é um passo rápido pelo arquivo)
+    total = len(tabela)
+    carregados = ja_carregados
+    registros = itertools.islice(iter(tabela), ja_carregados, None)
+    while True:
+        lote = list(itertools.islice(registros, tamanho_lote))
+        if not lote:
+            break
+        _inserir_lote(conn, lote, campos, tipos, arquivo)
+        carregados += len(lote)
+        if progresso:
+            progresso(arquivo, carregados, total)
+
+    conn.execute(f'UPDATE {CONTROLE} SET CONCLUIDO = true WHERE ARQUIVO = ?', [arquivo])
+    return carregados - ja_carregados
+
+
+def carregar_dbfs(conn, caminhos, **opcoes):
+    return {caminho: carregar_dbf(conn, caminho, **opcoes) for caminho in caminhos}
+
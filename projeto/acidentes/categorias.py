@@ -0,0 +1,130 @@
+# Tabelas de categorias compartilhadas pelas análises em pandas e em SQL
+
+# IDs dos municípios e seus nomes
+municipios_nome = {431390: 'Panambi', 431020: 'Ijuí', 431410: 'Passo Fundo'}
+
+# Atividade econômica predominante de cada cidade, anotada nos gráficos
+atividades_economicas = {
+    'Panambi': 'Indústria',
+    'Ijuí': 'Agronegócio',
+    'Passo Fundo': 'Comércio e Serviços'
+}
+
+
+# Nome do município para exibição; códigos sem nome cadastrado aparecem como estão
+def nome_municipio(codigo):
+    return municipios_nome.get(codigo, str(codigo))
+
+# Faixas etárias: (rótulo, idade máxima da faixa); a última faixa não tem limite
+faixas_etarias = [
+    ('<18', 17),
+    ('18-25', 25),
+    ('26-35', 35),
+    ('36-50', 50),
+    ('>50', None),
+]
+
+tipos_acidentes = {
+    'Z209': 'Exp. Material Biológico',
+    'Y96': 'Grave/Fatal/Crianças',
+    'V01-V09': 'Pedestres (veículos)',
+    'V10-V19': 'Ciclistas',
+    'V20-V29': 'Motociclistas',
+    'V30-V39': 'Ocupantes de carros',
+    'V40-V49': 'Ocupantes de caminhões/vans',
+    'V80-V89': 'Outros veículos',
+    'W00-W19': 'Quedas',
+    'W20-W49': 'Forças mecânicas',
+    'W50-W64': 'Golpes (animais/pessoas)',
+    'W85-W99': 'Eletricidade',
+    'X00-X09': 'Fogo/Calor',
+    'X10-X19': 'Substâncias corrosivas',
+    'X30': 'Calor excessivo',
+    'X31': 'Frio excessivo',
+    'X33': 'Forças naturais',
+    'X40-X44': 'Intoxicação (drogas/medicamentos)',
+    'X45': 'Intoxicação por álcool',
+    'X46': 'Intoxicação por solventes',
+    'X60-X84': 'Lesões autoinfligidas',
+    'X85-Y09': 'Agressões',
+    'Y10-Y34': 'Intenção indeterminada',
+    'Y35': 'Intervenções legais/guerra',
+    'Y85-Y89': 'Sequelas de causas externas'
+}
+
+
+# Literal de texto SQL (entre aspas simples, com as aspas internas dobradas),
+# para valores que não podem ser parâmetros: caminhos de arquivo, tipos de
+# colunas e os rótulos das expressões abaixo
+def texto_sql(valor):
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+# Expressão SQL equivalente a idade.decodificar_idade: o primeiro dígito do
+# código é a unidade (1 horas, 2 dias, 3 meses, 4 anos, 5 anos acima de 100)
+def sql_idade(coluna):
+    codigo = f'TRY_CAST({coluna} AS INTEGER)'
+    return (
+        f'(CASE {codigo} // 1000'
+        f' WHEN 4 THEN {codigo} % 1000'
+        f' WHEN 3 THEN ({codigo} % 1000) // 12'
+        f' WHEN 2 THEN 0 WHEN 1 THEN 0'
+        f' WHEN 5 THEN 100 + {codigo} % 1000 END)'
+    )
+
+
+# Expressão SQL equivalente a idade.faixa_etaria_da_coluna; idade inválida
+# fica sem faixa (NULL)
+def sql_faixa_etaria(coluna):
+    idade = sql_idade(coluna)
+    casos = []
+    for rotulo, maximo in faixas_etarias:
+        if maximo is None:
+            casos.append(f'WHEN {idade} IS NOT NULL THEN {texto_sql(rotulo)}')
+        else:
+            casos.append(f'WHEN {idade} <= {maximo} THEN {texto_sql(rotulo)}')
+    return 'CASE ' + ' '.join(casos) + ' END'
+
+
+# Expressão SQL equivalente a classificar_acidente: a primeira entrada de
+# tipos_acidentes que casar com o código vence, e o resto vira 'Outros'
+def sql_tipo_acidente(coluna):
+    cid = f'CAST({coluna} AS VARCHAR)'
+    casos = []
+    for codigo, descricao in tipos_acidentes.items():
+        if '-' in codigo:
+            inicio, fim = codigo.split('-')
+            condicao = f'{cid} BETWEEN {texto_sql(inicio)} AND {texto_sql(fim)}'
+        else:
+            condicao = f'{cid} = {texto_sql(codigo)}'
+        casos.append(f'WHEN {condicao} THEN {texto_sql(descricao)}')
+    return 'CASE ' + ' '.join(casos) + " ELSE 'Outros' END"
+
+
+# Capítulos da CID-10. Os limites finais têm 4 caracteres para incluir as
+# subcategorias (a comparação é de texto, como em tipos_acidentes).
+# Para ampliar as categorias: {**tipos_acidentes, **capitulos_cid10}
+capitulos_cid10 = {
+    'A00-B999': 'Doenças infecciosas e parasitárias',
+    'C00-D489': 'Neoplasias',
+    'D50-D899': 'Doenças do sangue e imunitárias',
+    'E00-E909': 'Doenças endócrinas e metabólicas',
+    'F00-F999': 'Transtornos mentais e comportamentais',
+    'G00-G999': 'Doenças do sistema nervoso',
+    'H00-H599': 'Doenças do olho e anexos',
+    'H60-H959': 'Doenças do ouvido',
+    'I00-I999': 'Doenças do aparelho circulatório',
+    'J00-J999': 'Doenças do aparelho respiratório',
+    'K00-K939': 'Doenças do aparelho digestivo',
+    'L00-L999': 'Doenças da pele',
+    'M00-M999': 'Doenças osteomusculares',
+    'N00-N999': 'Doenças do aparelho geniturinário',
+    'O00-O999': 'Gravidez, parto e puerpério',
+    'P00-P969': 'Afecções perinatais',
+    'Q00-Q999': 'Malformações congênitas',
+    'R00-R999': 'Sintomas e achados anormais',
+    'S00-T989': 'Lesões e envenenamentos',
+    'U00-U999': 'Códigos especiais',
+    'V01-Y989': 'Outras causas externas',
+    'Z00-Z999': 'Fatores de contato com serviços de saúde',
+}
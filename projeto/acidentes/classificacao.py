@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from acidentes.categorias import tipos_acidentes
+
+
+def _intervalos(tabela):
+    for codigo, descricao in tabela.items():
+        inicio, _, fim = codigo.partition('-')
+        yield inicio, fim or inicio, descricao
+
+
+# Pré-compila uma tabela no formato de tipos_acidentes ('V01-V09' ou 'Z209').
+# Os limites de todos os intervalos viram uma lista ordenada de fronteiras;
+# códigos exatos são intervalos de um ponto só. Cada fronteira e cada trecho
+# entre duas fronteiras recebe o rótulo da primeira entrada da tabela que o
+# cobre, como no laço de classificar_acidente. Classificar um código passa a
+# ser uma busca binária, qualquer que seja o tamanho da tabela.
+def compilar_classificador(tabela=tipos_acidentes, padrao='Outros'):
+    intervalos = list(_intervalos(tabela))
+    fronteiras = np.array(sorted({p for inicio, fim, _ in intervalos for p in (inicio, fim)}))
+
+    # célula 0: antes da primeira fronteira; 2k+1: exatamente na fronteira k;
+    # 2k+2: entre as fronteiras k e k+1 (ou depois da última)
+    rotulos = np.full(2 * len(fronteiras) + 1, padrao, dtype=object)
+    proxima = np.append(fronteiras[1:], fronteiras[-1])
+    ultima = np.arange(len(fronteiras)) == len(fronteiras) - 1
+    for inicio, fim, descricao in reversed(intervalos):
+        no_ponto = (inicio <= fronteiras) & (fronteiras <= fim)
+        no_trecho = (inicio <= fronteiras) & (proxima <= fim) & ~ultima
+        rotulos[1::2][no_ponto] = descricao
+        rotulos[2::2][no_trecho] = descricao
+
+    def rotular(codigos):
+        codigos = np.asarray(codigos, dtype=str)
+        posicao = np.searchsorted(fronteiras, codigos, side='right') - 1
+        exato = fronteiras[np.maximum(posicao, 0)] == codigos
+        return rotulos[2 * posicao + 2 - exato]
+
+    # Rotula uma coluna inteira: cada código distinto é classificado uma vez
+    # e os valores ausentes ficam com o rótulo padrão
+    def classificar(serie):
+        indices, unicos = pd.factorize(serie)
+        rotulos_unicos = rotular([str(valor) for valor in unicos])
+        resultado = np.append(rotulos_unicos, padrao)[indices]
+        return pd.Series(resultado, index=serie.index, name=serie.name)
+
+    classificar.rotular = rotular
+    return classificar
+
+
+classificar_acidentes = compilar_classificador()
@@ -0,0 +1,536 @@
+# Linha de comando: `python -m acidentes <subcomando>` (dentro da pasta projeto).
+# Cada relatório é um subcomando; pandas, DuckDB e matplotlib só são
+# importados quando o subcomando precisa deles.
+import argparse
+import sys
+
+from acidentes.instrumentacao import ativa, etapa
+
+BANCO = './database/database_cd.db'
+OCUPACOES_CSV = './OCUPANET.csv'
+REFERENCIA_CSV = './referencia_municipios.csv'
+CACHE = './.cache_consultas'
+
+# Subcomandos de relatório (acidentes.relatorios.RELATORIOS) e sua descrição
+RELATORIOS = {
+    'municipios': 'quantidade de acidentes por município e ano',
+    'faixas': 'faixas etárias afetadas em cada município',
+    'tipos': 'tipos de acidente por município e ano',
+    'pib': 'acidentes comparados com densidade demográfica e PIB',
+    'cargos': 'cargos com mais acidentes no total',
+    'cargos-municipios': 'cargos com mais acidentes em cada município',
+    'cargos-faixas': 'faixas etárias dos cargos mais afetados em cada município',
+}
+
+# Subcomandos que consultam o banco pelas funções de agregacao (usam o cache)
+CONSULTAS = {*RELATORIOS, 'todos', 'tabela', 'serie', 'variacao', 'exportar-agregados'}
+
+# Etapas medidas pelo subcomando `benchmark` (acidentes.benchmark.ETAPAS)
+ETAPAS_BENCHMARK = ['carga_csv', 'carga_banco', 'idade', 'classificacao', 'juncao_ocupacoes', 'agregacao', 'cubo', 'renderizacao']
+
+# Tabelas de contagem que o subcomando `tabela` imprime em CSV
+TABELAS = {
+    'municipio': ['ID_MUNICIP'],
+    'faixa_etaria': ['ID_MUNICIP', 'FAIXA_ETARIA'],
+    'tipo_acidente': ['ID_MUNICIP', 'TIPO_ACIDENTE'],
+    'cargo': ['ID_MUNICIP', 'CARGO'],
+    'cargo_faixa_etaria': ['ID_MUNICIP', 'CARGO', 'FAIXA_ETARIA'],
+}
+
+
+# Tabelas do subcomando `variacao`: a última dimensão é a categoria comparada
+VARIACOES = {nome: TABELAS[nome] for nome in ['municipio', 'faixa_etaria', 'tipo_acidente']}
+
+
+# Nível de confiança dos intervalos (--intervalos e --confianca), também
+# usado pelo analiseCSV.py
+def nivel_confianca(valor):
+    confianca = float(valor)
+    if not 0 < confianca < 1:
+        raise argparse.ArgumentTypeError(f'use um valor entre 0 e 1, ex.: 0.95 (recebido: {valor})')
+    return confianca
+
+
+# Porcentagem das linhas lidas no modo aproximado (--amostra)
+def _porcentagem(valor):
+    porcentagem = float(valor)
+    if not 0 < porcentagem <= 100:
+        raise argparse.ArgumentTypeError(f'use uma porcentagem entre 0 e 100, ex.: 1 (recebido: {valor})')
+    return porcentagem
+
+
+# Sem municípios nem UF, a análise fica nos três municípios do trabalho
+def _municipios(municipios, uf):
+    if municipios is None and uf is None:
+        from acidentes.categorias import municipios_nome
+        return list(municipios_nome)
+    return municipios
+
+
+# Abre o banco só para leitura quando nada precisa ser gravado: o cubo é
+# atualizado quando a fonte é 'cubo' e a tabela de ocupações é carregada
+# quando a consulta usa cargos. Com parquet (pasta de exportar-parquet), a
+# tabela de acidentes é lida dos arquivos Parquet e o banco não é aberto.
+# Com referencia (CSV), a referência dos municípios é carregada na conexão.
+# Com recalcular_cubo, o cubo é recalculado inteiro, e não só os anos alterados.
+def _conectar(banco, fonte, cargos, ocupacoes, parquet=None, referencia=None, recalcular_cubo=False):
+    if parquet:
+        from acidentes.parquet import conectar
+        try:
+            conn = conectar(parquet)
+        except FileNotFoundError as e:
+            sys.exit(str(e))
+    else:
+        import duckdb
+        conn = duckdb.connect(banco, read_only=fonte != 'cubo' and not cargos)
+    if fonte == 'cubo':
+        from acidentes.cubo import atualizar_cubo
+        with etapa('cubo') as medida:
+            medida['saida'] = len(atualizar_cubo(conn, forcar=recalcular_cubo))
+    if cargos:
+        from acidentes.ocupacoes import carregar_ocupacoes
+        try:
+            with etapa('ocupacoes') as medida:
+                medida['saida'] = carregar_ocupacoes(conn, ocupacoes)
+        except Exception as e:
+            conn.close()
+            sys.exit(f"Ocorreu um erro ao ler o arquivo: {e}")
+    if referencia:
+        from acidentes.referencia import carregar_referencia
+        try:
+            with etapa('referencia') as medida:
+                medida['saida'] = carregar_referencia(conn, referencia)
+        except Exception as e:
+            conn.close()
+            sys.exit(f"Ocorreu um erro ao ler a referência dos municípios: {e}")
+    return conn
+
+
+# Linhas da tabela lida pelas consultas, só para o relatório de execução
+def _linhas_fonte(conn, fonte):
+    from acidentes.agregacao import CUBO, TABELA
+    return conn.execute(f"SELECT COUNT(*) FROM {CUBO if fonte == 'cubo' else TABELA}").fetchone()[0]
+
+
+# Gera os gráficos dos relatórios pedidos com uma só conexão e uma só
+# renderização em lote. Devolve (gerados, pulados) como renderizacao.renderizar.
+# Com confianca (ex.: 0.95), os relatórios de RELATORIOS_INTERVALOS desenham
+# barras de erro com o intervalo de confiança das contagens.
+def executar_relatorios(nomes, banco=BANCO, anos=(2022, 2023), municipios=None, uf=None,
+                        fonte='bruto', ocupacoes=OCUPACOES_CSV, saida='.', processos=None, parquet=None,
+                        referencia=REFERENCIA_CSV, confianca=None, recalcular_cubo=False):
+    from acidentes.agregacao import amostra_ativa
+    from acidentes.relatorios import RELATORIOS as FUNCOES, RELATORIOS_CARGOS, RELATORIOS_INTERVALOS, RELATORIOS_REFERENCIA
+    from acidentes.renderizacao import renderizar
+
+    municipios = _municipios(municipios, uf)
+    referencia = referencia if RELATORIOS_REFERENCIA & set(nomes) else None
+    conn = _conectar(banco, fonte, bool(RELATORIOS_CARGOS & set(nomes)), ocupacoes, parquet, referencia, recalcular_cubo)
+    try:
+        entrada = _linhas_fonte(conn, fonte) if ativa() else None
+        amostra = amostra_ativa()
+        graficos = []
+        for nome in nomes:
+            with etapa(f'consulta:{nome}', entrada) as medida:
+                opcoes = {'confianca': confianca} if confianca and nome in RELATORIOS_INTERVALOS else {}
+                novos = FUNCOES[nome](conn, list(anos), municipios, uf, fonte, **opcoes)
+                medida['saida'] = sum(len(item['dados']) for item in novos)
+            if amostra:
+                # o título de cada gráfico avisa que as contagens são estimadas
+                for item in novos:
+                    item['estilo']['titulo'] += f" [APROXIMADO: amostra de {amostra['taxa'] * 100:g}%]"
+            graficos += novos
+    finally:
+        conn.close()
+    with etapa('renderizacao', entrada=len(graficos)) as medida:
+        gerados, pulados = renderizar(graficos, saida, processos)
+        medida['saida'] = len(gerados)
+    return gerados, pulados
+
+
+def _relatorio(args):
+    nomes = list(RELATORIOS) if args.comando == 'todos' else [args.comando]
+    gerados, pulados = executar_relatorios(
+        nomes, args.banco, args.anos, args.municipios, args.uf,
+        args.fonte, args.ocupacoes, args.saida, args.processos, args.parquet, args.referencia, args.intervalos,
+        args.recalcular_cubo
+    )
+    print(f"{len(gerados)} gráficos gerados, {len(pulados)} sem alteração")
+
+
+def _tabela(args):
+    from acidentes.agregacao import contar, contar_em_lotes
+
+    dimensoes = TABELAS[args.tabela]
+    municipios = _municipios(args.municipios, args.uf)
+    conn = _conectar(args.banco, args.fonte, 'CARGO' in dimensoes, args.ocupacoes, args.parquet, recalcular_cubo=args.recalcular_cubo)
+    try:
+        with etapa('consulta', _linhas_fonte(conn, args.fonte) if ativa() else None) as medida:
+            if args.lotes:
+                # sem cache, mas com memória limitada ao tamanho do lote
+                medida['saida'] = 0
+                for i, lote in enumerate(contar_em_lotes(conn, dimensoes, args.anos, municipios, args.uf, args.fonte, args.lotes)):
+                    lote.to_csv(sys.stdout, index=False, header=i == 0)
+                    medida['saida'] += len(lote)
+            else:
+                contagem = contar(conn, dimensoes, args.anos, municipios, args.uf, args.fonte)
+                contagem.to_csv(sys.stdout, index=False)
+                medida['saida'] = len(contagem)
+    finally:
+        conn.close()
+
+
+# As séries ficam no banco (series.py), então ele é aberto para gravação;
+# com --parquet, são recalculadas numa conexão em memória a cada execução
+def _serie(args):
+    from acidentes.series import atualizar_series, serie
+
+    if args.parquet:
+        conn = _conectar(args.banco, 'bruto', False, None, args.parquet)
+    else:
+        import duckdb
+        conn = duckdb.connect(args.banco)
+    try:
+        with etapa('series') as medida:
+            medida['saida'] = len(atualizar_series(conn, args.data, args.recalcular))
+        with etapa('consulta') as medida:
+            resultado = serie(conn, args.granularidade, args.anos, _municipios(args.municipios, args.uf), args.uf,
+                              args.por_tipo, args.janela, args.data)
+            medida['saida'] = len(resultado)
+    except ValueError as e:
+        sys.exit(str(e))
+    finally:
+        conn.close()
+    resultado.to_csv(sys.stdout, index=False)
+
+
+def _variacao(args):
+    from acidentes.agregacao import amostra_ativa, contar
+    from acidentes.estatistica import variacao_entre_anos
+
+    # os intervalos supõem as contagens exatas
+    if amostra_ativa():
+        sys.exit('O subcomando variacao não usa o modo aproximado; rode sem --amostra')
+    if len(args.anos) != 2:
+        sys.exit('Informe dois anos em --anos: o anterior e o posterior')
+    antes, depois = args.anos
+    conn = _conectar(args.banco, args.fonte, False, args.ocupacoes, args.parquet, recalcular_cubo=args.recalcular_cubo)
+    try:
+        with etapa('consulta') as medida:
+            contagens = contar(conn, VARIACOES[args.tabela], args.anos, _municipios(args.municipios, args.uf), args.uf, args.fonte)
+            medida['saida'] = len(contagens)
+    finally:
+        conn.close()
+    try:
+        with etapa('intervalos', len(contagens)) as medida:
+            variacoes = variacao_entre_anos(contagens, antes, depois, args.confianca, args.reamostras, args.semente)
+            medida['saida'] = len(variacoes)
+    except ValueError as e:
+        sys.exit(str(e))
+    variacoes.to_csv(sys.stdout)
+
+
+def _carregar_dbf(args):
+    import duckdb
+    from acidentes.carga_dbf import carregar_dbfs
+
+    conn = duckdb.connect(args.banco)
+    try:
+        carregar_dbfs(conn, args.arquivos, tamanho_lote=args.lote)
+    finally:
+        conn.close()
+
+
+def _exportar_parquet(args):
+    import duckdb
+    from acidentes.parquet import exportar_parquet
+
+    conn = duckdb.connect(args.banco, read_only=True)
+    try:
+        with etapa('exportacao') as medida:
+            medida['saida'] = exportar_parquet(conn, args.pasta, args.anos)
+    finally:
+        conn.close()
+    print(f"{medida['saida']} linhas exportadas para {args.pasta}")
+
+
+def _exportar_agregados(args):
+    from acidentes.exportacao import AGREGADOS, AGREGADOS_CARGOS, exportar_agregados
+
+    tabelas = args.tabelas or list(AGREGADOS)
+    conn = _conectar(args.banco, args.fonte, bool(AGREGADOS_CARGOS & set(tabelas)), args.ocupacoes, args.parquet,
+                     recalcular_cubo=args.recalcular_cubo)
+    try:
+        with etapa('exportacao') as medida:
+            manifesto = exportar_agregados(conn, args.pasta, args.anos, _municipios(args.municipios, args.uf), args.uf,
+                                           args.fonte, tabelas)
+            medida['saida'] = sum(tabela['linhas'] for tabela in manifesto['tabelas'].values())
+    finally:
+        conn.close()
+    for nome, tabela in manifesto['tabelas'].items():
+        print(f"{nome}: {tabela['linhas']} linhas")
+
+
+# Não passa pelo cache de consultas: os tempos e as tabelas de cada backend
+# são sempre os da execução
+def _comparar_backends(args):
+    from acidentes.pipeline import comparar_backends
+
+    entradas = {}
+    if args.csv:
+        entradas.update({'pandas': args.csv, 'csv': args.csv})
+    if args.banco:
+        entradas['banco'] = args.banco
+    if args.parquet:
+        entradas['parquet'] = args.parquet
+    if len(entradas) < 2:
+        sys.exit('Informe ao menos duas entradas para comparar (--csv já compara o pandas com o DuckDB)')
+    try:
+        resultado = comparar_backends(entradas, args.anos, _municipios(args.municipios, args.uf), args.uf)
+    except (ValueError, FileNotFoundError) as e:
+        sys.exit(str(e))
+    referencia = next(iter(resultado))
+    for backend, item in resultado.items():
+        situacao = 'referência' if backend == referencia else 'idêntico' if not item['diferencas'] else 'DIFERENTE'
+        print(f"{backend}: {item['segundos']:.2f} s, {situacao}")
+        for tabela, diferenca in item['diferencas'].items():
+            print(f"  {tabela}: {diferenca}")
+    if any(item['diferencas'] for item in resultado.values()):
+        sys.exit(1)
+
+
+def _servidor(args):
+    import asyncio
+    from acidentes.servidor import servir
+
+    # só leitura: o servidor não atualiza o cubo, e as ocupações ficam na memória
+    ocupacoes = None
+    try:
+        from acidentes.ocupacoes import ler_ocupacoes
+        ocupacoes = ler_ocupacoes(args.ocupacoes)
+    except Exception as e:
+        print(f"ocupações não carregadas ({e}); /api/top-cargos usa a tabela do banco, se houver", file=sys.stderr)
+    conn = _conectar(args.banco, 'bruto', False, None, args.parquet)
+    try:
+        asyncio.run(servir(conn, args.painel, args.host, args.porta, ocupacoes=ocupacoes))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+
+
+def _painel(args):
+    from acidentes.painel import construir_painel
+
+    resultado = construir_painel(args.graficos, args.painel)
+    print(f"{len(resultado['copiadas'])} imagens copiadas, {len(resultado['removidas'])} removidas, "
+          f"{len(resultado['secoes_alteradas'])} seções alteradas")
+
+
+def _gerar_dados(args):
+    from acidentes import sinteticos
+
+    if args.csv:
+        for ano, caminho in sinteticos.gerar_csv(args.csv, args.linhas, args.anos, args.ocupacoes, args.semente, args.lote).items():
+            print(f"{ano}: {caminho}")
+    if args.referencia:
+        print(f"referência: {sinteticos.gerar_referencia(args.referencia, args.semente)}")
+    if args.banco:
+        import duckdb
+
+        conn = duckdb.connect(args.banco)
+        try:
+            total = sinteticos.gerar_banco(conn, args.linhas, args.anos, args.ocupacoes, args.semente, args.lote)
+        finally:
+            conn.close()
+        print(f"{total} linhas gravadas em {args.banco}")
+
+
+def _benchmark(args):
+    from acidentes import benchmark
+
+    resultado = benchmark.executar_benchmark(args.linhas, args.anos, args.ocupacoes, args.etapas, args.repeticoes, args.semente)
+    if args.saida:
+        benchmark.gravar_resultado(resultado, args.saida)
+    if args.comparar:
+        regressoes = benchmark.comparar(resultado, benchmark.ler_resultado(args.comparar), args.tolerancia)
+        for etapa, (antes, agora) in regressoes.items():
+            print(f"regressão em {etapa}: {antes:.3f} s -> {agora:.3f} s")
+        if regressoes:
+            sys.exit(1)
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog='python -m acidentes', description='Análises dos acidentes de trabalho do DATASUS.')
+    parser.add_argument('--instrumentar', metavar='PASTA', help='grava em PASTA um relatório JSON com tempo, CPU, memória e linhas de cada etapa')
+    parser.add_argument('--perfil', action='store_true', help='com --instrumentar, grava também o cProfile da etapa mais lenta')
+    parser.add_argument('--cache', default=CACHE, metavar='PASTA', help=f'pasta do cache de resultados das consultas (padrão: {CACHE})')
+    parser.add_argument('--sem-cache', dest='cache', action='store_const', const=None, help='consulta sempre o banco')
+    parser.add_argument('--cache-limite', type=int, default=256, metavar='MB', help='tamanho máximo do cache (padrão: 256 MB)')
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    consulta = argparse.ArgumentParser(add_help=False)
+    consulta.add_argument('--banco', default=BANCO)
+    consulta.add_argument('--anos', nargs='+', type=int, default=[2022, 2023])
+    consulta.add_argument('--municipios', nargs='+', type=int, help='códigos IBGE (padrão: Panambi, Ijuí e Passo Fundo)')
+    consulta.add_argument('--uf', type=int, help='código IBGE da UF, ex.: 43 para o RS')
+    consulta.add_argument('--fonte', choices=['bruto', 'cubo'], default='bruto')
+    consulta.add_argument('--recalcular-cubo', action='store_true',
+                          help='com --fonte cubo, recalcula o cubo de todos os anos (padrão: só os anos cujas linhas mudaram)')
+    consulta.add_argument('--ocupacoes', default=OCUPACOES_CSV, help='CSV de ocupações (relido quando o arquivo muda)')
+    consulta.add_argument('--parquet', metavar='PASTA', help='lê os acidentes da exportação em Parquet (exportar-parquet) em vez do banco')
+    consulta.add_argument('--amostra', type=_porcentagem, metavar='PCT',
+                          help='modo aproximado: estima as contagens a partir de PCT%% das linhas, com o erro padrão (QTD_ERRO) e o limite superior de 95%% (QTD_MAX)')
+    consulta.add_argument('--metodo-amostra', choices=['bernoulli', 'system'], default='bernoulli',
+                          help='bernoulli sorteia linha a linha; system sorteia blocos de linhas (mais rápido, mas sem erro estimado)')
+
+    saida = argparse.ArgumentParser(add_help=False)
+    saida.add_argument('--saida', default='.', help='pasta dos gráficos')
+    saida.add_argument('--processos', type=int)
+    saida.add_argument('--referencia', default=REFERENCIA_CSV, help='CSV do IBGE com população, área e PIB por município (relatório pib)')
+    saida.add_argument('--intervalos', type=nivel_confianca, metavar='CONFIANCA',
+                       help='desenha barras de erro com o intervalo de confiança de Poisson das contagens, ex.: 0.95 (relatórios municipios e faixas)')
+
+    for nome, descricao in {**RELATORIOS, 'todos': 'todos os relatórios'}.items():
+        sub = subcomandos.add_parser(nome, parents=[consulta, saida], help=descricao)
+        sub.set_defaults(funcao=_relatorio)
+
+    sub = subcomandos.add_parser('tabela', parents=[consulta], help='imprime uma tabela de contagens em CSV')
+    sub.add_argument('tabela', choices=list(TABELAS))
+    sub.add_argument('--lotes', type=int, metavar='LINHAS', help='escreve o resultado em lotes de LINHAS linhas, sem carregá-lo inteiro (não usa o cache)')
+    sub.set_defaults(funcao=_tabela)
+
+    sub = subcomandos.add_parser('variacao', parents=[consulta], help='imprime em CSV a variação entre dois anos com intervalos de confiança de Poisson e bootstrap')
+    sub.add_argument('tabela', choices=list(VARIACOES))
+    sub.add_argument('--confianca', type=nivel_confianca, default=0.95)
+    sub.add_argument('--reamostras', type=int, default=10_000, help='reamostras do bootstrap (padrão: 10000)')
+    sub.add_argument('--semente', type=int, default=0)
+    sub.set_defaults(funcao=_variacao)
+
+    sub = subcomandos.add_parser('serie', help='imprime em CSV a série mensal ou semanal de acidentes, com média móvel e variação anual')
+    sub.add_argument('--banco', default=BANCO)
+    sub.add_argument('--anos', nargs='+', type=int, help='padrão: todos')
+    sub.add_argument('--municipios', nargs='+', type=int, help='códigos IBGE (padrão: Panambi, Ijuí e Passo Fundo)')
+    sub.add_argument('--uf', type=int, help='código IBGE da UF, ex.: 43 para o RS')
+    sub.add_argument('--granularidade', choices=['mes', 'semana'], default='mes')
+    sub.add_argument('--janela', type=int, default=3, help='períodos da média móvel (padrão: 3)')
+    sub.add_argument('--por-tipo', action='store_true', help='uma série por tipo de acidente em cada município')
+    sub.add_argument('--data', default='DT_NOTIFIC', help='coluna de data usada (padrão: DT_NOTIFIC, a da notificação)')
+    sub.add_argument('--recalcular', action='store_true', help='recalcula as séries de todos os meses (padrão: só os meses cujas linhas mudaram)')
+    sub.add_argument('--parquet', metavar='PASTA', help='lê os acidentes da exportação em Parquet em vez do banco')
+    sub.set_defaults(funcao=_serie)
+
+    sub = subcomandos.add_parser('carregar-dbf', help='carrega arquivos DBF do DATASUS no banco')
+    sub.add_argument('arquivos', nargs='+')
+    sub.add_argument('--banco', default=BANCO)
+    sub.add_argument('--lote', type=int, default=50_000)
+    sub.set_defaults(funcao=_carregar_dbf)
+
+    sub = subcomandos.add_parser('exportar-parquet', help='exporta a tabela de acidentes em Parquet particionado por ano, UF e município')
+    sub.add_argument('pasta')
+    sub.add_argument('--banco', default=BANCO)
+    sub.add_argument('--anos', nargs='+', type=int, help='substitui só as partições desses anos (padrão: recria a pasta com todos)')
+    sub.set_defaults(funcao=_exportar_parquet)
+
+    sub = subcomandos.add_parser('exportar-agregados', parents=[consulta],
+                                 help='grava as tabelas agregadas em Arrow IPC e Parquet, com um manifesto do esquema')
+    sub.add_argument('pasta')
+    sub.add_argument('--tabelas', nargs='+', choices=['municipio', 'faixa_etaria', 'tipo_acidente', 'cargos_municipio'],
+                     help='padrão: todas')
+    sub.set_defaults(funcao=_exportar_agregados)
+
+    sub = subcomandos.add_parser('comparar-backends',
+                                 help='conta os acidentes em cada backend (pandas, DuckDB sobre os CSVs, banco, Parquet) e confere se as tabelas são idênticas')
+    sub.add_argument('--csv', nargs='+', metavar='ARQUIVO', help='CSVs ACGRBR, lidos pelo pandas e pelo DuckDB')
+    sub.add_argument('--banco', help='banco DuckDB com a tabela de acidentes')
+    sub.add_argument('--parquet', metavar='PASTA', help='exportação em Parquet (exportar-parquet)')
+    sub.add_argument('--anos', nargs='+', type=int, default=[2022, 2023])
+    sub.add_argument('--municipios', nargs='+', type=int, help='códigos IBGE (padrão: Panambi, Ijuí e Passo Fundo)')
+    sub.add_argument('--uf', type=int, help='código IBGE da UF, ex.: 43 para o RS')
+    sub.set_defaults(funcao=_comparar_backends)
+
+    sub = subcomandos.add_parser('painel', help='gera o painel estático (index.html e assets) a partir dos gráficos')
+    sub.add_argument('--graficos', default='.')
+    sub.add_argument('--painel', default='../display/display')
+    sub.set_defaults(funcao=_painel)
+
+    sub = subcomandos.add_parser('servidor', help='serve as contagens em JSON e o painel interativo')
+    sub.add_argument('--banco', default=BANCO)
+    sub.add_argument('--parquet', metavar='PASTA', help='lê os acidentes da exportação em Parquet em vez do banco')
+    sub.add_argument('--host', default='127.0.0.1')
+    sub.add_argument('--porta', type=int, default=8000)
+    sub.add_argument('--painel', default='../display/display', help='pasta do painel (interativo.html)')
+    sub.add_argument('--ocupacoes', default=OCUPACOES_CSV, help='CSV de ocupações, para /api/top-cargos')
+    sub.set_defaults(funcao=_servidor)
+
+    sub = subcomandos.add_parser('gerar-dados', help='gera dados sintéticos no formato do DATASUS')
+    sub.add_argument('--linhas', type=int, default=100_000)
+    sub.add_argument('--anos', nargs='+', type=int, default=[2022, 2023])
+    sub.add_argument('--csv', help="um CSV por ano; o caminho deve conter {ano}, ex.: 'banco/ACGRBR{ano}.csv'")
+    sub.add_argument('--banco', help='banco DuckDB onde a tabela dadosacidentetrabalho é substituída')
+    sub.add_argument('--referencia', help='CSV de referência (população, área e PIB) dos municípios sintéticos')
+    sub.add_argument('--ocupacoes', default=OCUPACOES_CSV)
+    sub.add_argument('--semente', type=int, default=0)
+    sub.add_argument('--lote', type=int, default=1_000_000)
+    sub.set_defaults(funcao=_gerar_dados)
+
+    sub = subcomandos.add_parser('benchmark', help='mede o tempo e a memória de cada etapa sobre dados sintéticos')
+    sub.add_argument('--linhas', type=int, default=100_000)
+    sub.add_argument('--anos', nargs='+', type=int, default=[2022, 2023])
+    sub.add_argument('--etapas', nargs='+', choices=ETAPAS_BENCHMARK, default=ETAPAS_BENCHMARK)
+    sub.add_argument('--repeticoes', type=int, default=3)
+    sub.add_argument('--ocupacoes', default=OCUPACOES_CSV)
+    sub.add_argument('--semente', type=int, default=0)
+    sub.add_argument('--saida', help='grava o resultado em JSON')
+    sub.add_argument('--comparar', help='resultado JSON anterior; sai com erro se alguma etapa piorar')
+    sub.add_argument('--tolerancia', type=float, default=0.2, help='piora aceita na comparação (fração)')
+    sub.set_defaults(funcao=_benchmark)
+
+    return parser
+
+
+def _executar(args):
+    if not args.instrumentar:
+        args.funcao(args)
+        return
+
+    from acidentes.instrumentacao import execucao
+
+    with execucao(args.instrumentar, nome=args.comando, perfil=args.perfil) as relatorio:
+        args.funcao(args)
+    print(f"relatório de execução: {relatorio['arquivo']}", file=sys.stderr)
+
+
+def _executar_com_cache(args):
+    if args.comando not in CONSULTAS or not args.cache:
+        _executar(args)
+        return
+
+    from acidentes import cache_consultas
+
+    cache_consultas.ativar(args.cache, args.cache_limite * 2**20)
+    try:
+        _executar(args)
+        estatisticas = cache_consultas.estatisticas()
+        print(f"cache de consultas: {estatisticas['acertos']} acertos, {estatisticas['falhas']} falhas", file=sys.stderr)
+    finally:
+        cache_consultas.desativar()
+
+
+def main(argv=None):
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, 'amostra', None):
+        _executar_com_cache(args)
+        return
+    if args.fonte != 'bruto':
+        parser.error('--amostra só vale para a tabela bruta (--fonte bruto)')
+
+    from acidentes.agregacao import ativar_amostra, desativar_amostra
+
+    ativar_amostra(args.amostra / 100, args.metodo_amostra)
+    print(f"modo aproximado: contagens estimadas com {args.amostra:g}% das linhas", file=sys.stderr)
+    try:
+        _executar_com_cache(args)
+    finally:
+        desativar_amostra()
@@ -0,0 +1,62 @@
+from acidentes.agregacao import CUBO, DIMENSOES, TABELA
+
+# Tabela de controle: quantas linhas cada ano tinha na tabela bruta quando
+# foi agregado pela última vez, e a assinatura dessas linhas
+PARTICOES = 'cubo_particoes'
+
+# Dimensões guardadas no cubo: todo gráfico é um recorte delas
+DIMENSOES_CUBO = ['NU_ANO', 'ID_MUNICIP', 'FAIXA_ETARIA', 'TIPO_ACIDENTE', 'ID_OCUPA_N']
+
+# Colunas da tabela bruta de que o cubo depende, além de NU_ANO. A assinatura
+# de um ano é a soma do hash dessas colunas em cada linha: muda se alguma
+# linha for corrigida ou trocada, mesmo que a quantidade continue a mesma.
+COLUNAS_ORIGEM = ['ID_MUNICIP', 'NU_IDADE_N', 'CID_ACID', 'ID_OCUPA_N']
+
+
+def _select_cubo(where):
+    colunas = ', '.join(f'{DIMENSOES[d]} AS {d}' for d in DIMENSOES_CUBO)
+    return f'SELECT {colunas}, COUNT(*) AS QTD FROM {TABELA} WHERE {where} GROUP BY ALL'
+
+
+def _criar_tabelas(conn):
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {CUBO} AS {_select_cubo("false")}')
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {PARTICOES} (NU_ANO INTEGER PRIMARY KEY, LINHAS BIGINT, ASSINATURA HUGEINT)')
+    # bancos criados antes da assinatura: os anos sem ela são recalculados uma vez
+    conn.execute(f'ALTER TABLE {PARTICOES} ADD COLUMN IF NOT EXISTS ASSINATURA HUGEINT')
+
+
+# Cria ou atualiza o cubo de contagens (ano x município x faixa etária x tipo
+# de acidente x ocupação) a partir de dadosacidentetrabalho. Só os anos novos
+# ou com quantidade de linhas ou assinatura diferentes da última agregação são
+# recalculados (com forcar, todos); anos que sumiram da tabela bruta são
+# removidos. Devolve os anos recalculados.
+def atualizar_cubo(conn, forcar=False):
+    _criar_tabelas(conn)
+    atuais = {ano: (linhas, assinatura) for ano, linhas, assinatura in conn.execute(
+        f"SELECT NU_ANO, COUNT(*), SUM(hash({', '.join(COLUNAS_ORIGEM)})) FROM {TABELA} "
+        'WHERE NU_ANO IS NOT NULL GROUP BY NU_ANO'
+    ).fetchall()}
+    registrados = {ano: (linhas, assinatura) for ano, linhas, assinatura in conn.execute(
+        f'SELECT NU_ANO, LINHAS, ASSINATURA FROM {PARTICOES}'
+    ).fetchall()}
+
+    recalcular = sorted(ano for ano, marca in atuais.items() if forcar or registrados.get(ano) != marca)
+    remover = sorted(set(registrados) - set(atuais))
+    if not recalcular and not remover:
+        return []
+
+    descartar = recalcular + remover
+    marcadores = ', '.join('?' for _ in descartar)
+    conn.begin()
+    try:
+        conn.execute(f'DELETE FROM {CUBO} WHERE NU_ANO IN ({marcadores})', descartar)
+        conn.execute(f'DELETE FROM {PARTICOES} WHERE NU_ANO IN ({marcadores})', descartar)
+        if recalcular:
+            marcadores = ', '.join('?' for _ in recalcular)
+            conn.execute(f'INSERT INTO {CUBO} {_select_cubo(f"NU_ANO IN ({marcadores})")}', recalcular)
+            conn.executemany(f'INSERT INTO {PARTICOES} VALUES (?, ?, ?)', [[ano, *atuais[ano]] for ano in recalcular])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return recalcular
@@ -0,0 +1,128 @@
+# Intervalos de confiança das contagens de acidentes e da variação entre dois
+# anos. Cada contagem é tratada como uma Poisson: o intervalo de uma contagem
+# usa a aproximação de Byar para o intervalo exato, e o da variação
+# (depois - antes) a aproximação normal, com variância antes + depois. O
+# bootstrap reamostra os acidentes pelo bootstrap de Poisson (cada célula da
+# tabela vira uma Poisson com média na contagem observada), com todas as
+# reamostras de um bloco de grupos geradas de uma vez em arrays do NumPy, e
+# dá também o intervalo da variação da participação de cada categoria no
+# total do grupo (a porcentagem de calcular_porcentagem), em pontos percentuais.
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# Máximo de valores (reamostras x células) gerados por bloco, para limitar a memória
+ELEMENTOS_POR_BLOCO = 5_000_000
+
+
+def _z(confianca):
+    if not 0 < confianca < 1:
+        raise ValueError(f'Nível de confiança inválido: {confianca} (use um valor entre 0 e 1, ex.: 0.95)')
+    return NormalDist().inv_cdf(0.5 + confianca / 2)
+
+
+# (inferior, superior) da média de cada contagem, com a forma de contagens.
+# A partir de uns 5 acidentes a aproximação erra menos de 1%; com 1 ou 2, o
+# limite inferior fica abaixo do exato (o intervalo fica mais largo)
+def intervalo_poisson(contagens, confianca=0.95):
+    z = _z(confianca)
+    k = np.asarray(contagens, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inferior = np.where(k > 0, k * (1 - 1 / (9 * k) - z / (3 * np.sqrt(k))) ** 3, 0.0)
+    k1 = k + 1
+    superior = k1 * (1 - 1 / (9 * k1) + z / (3 * np.sqrt(k1))) ** 3
+    return inferior, superior
+
+
+# (inferior, superior) de depois - antes
+def variacao_poisson(antes, depois, confianca=0.95):
+    antes = np.asarray(antes, dtype='float64')
+    depois = np.asarray(depois, dtype='float64')
+    margem = _z(confianca) * np.sqrt(antes + depois)
+    return depois - antes - margem, depois - antes + margem
+
+
+def _participacao(contagens):
+    totais = contagens.sum(axis=-1, keepdims=True)
+    return np.divide(contagens * 100.0, totais, out=np.zeros(contagens.shape), where=totais > 0)
+
+
+# antes e depois: contagens de cada ano em arrays grupos x categorias (por
+# exemplo, municípios x faixas etárias; para comparar municípios entre si,
+# uma linha só com os municípios nas colunas). Devolve {'variacao': (inferior,
+# superior), 'participacao': (inferior, superior)}, cada array com a forma de
+# antes: o intervalo de depois - antes e o da variação, em pontos percentuais,
+# da participação da categoria no total do grupo.
+def bootstrap_variacao(antes, depois, confianca=0.95, reamostras=10_000, semente=0):
+    antes = np.asarray(antes, dtype='int64')
+    depois = np.asarray(depois, dtype='int64')
+    if antes.ndim != 2 or antes.shape != depois.shape:
+        raise ValueError(f'As contagens devem ser duas tabelas grupos x categorias do mesmo tamanho ({antes.shape} e {depois.shape})')
+    _z(confianca)
+    quantis = [(1 - confianca) / 2, (1 + confianca) / 2]
+    rng = np.random.default_rng(semente)
+
+    resultado = {'variacao': np.empty((2, *antes.shape)), 'participacao': np.empty((2, *antes.shape))}
+    grupos_por_bloco = max(1, ELEMENTOS_POR_BLOCO // (reamostras * max(1, antes.shape[1])))
+    for inicio in range(0, len(antes), grupos_por_bloco):
+        bloco = slice(inicio, inicio + grupos_por_bloco)
+        # reamostras x grupos do bloco x categorias, para cada ano
+        amostra_antes = rng.poisson(antes[bloco], size=(reamostras, *antes[bloco].shape))
+        amostra_depois = rng.poisson(depois[bloco], size=(reamostras, *depois[bloco].shape))
+        resultado['variacao'][:, bloco] = np.quantile(amostra_depois - amostra_antes, quantis, axis=0)
+        resultado['participacao'][:, bloco] = np.quantile(_participacao(amostra_depois) - _participacao(amostra_antes), quantis, axis=0)
+    return {chave: (intervalos[0], intervalos[1]) for chave, intervalos in resultado.items()}
+
+
+# Variações entre dois anos a partir de duas tabelas de contagens (grupos nas
+# linhas, categorias nas colunas), em formato longo: uma linha por grupo e
+# categoria com as contagens, a variação e seus intervalos de Poisson e de
+# bootstrap, a participação em cada ano e a variação da participação com o
+# intervalo de bootstrap. SIGNIFICATIVA indica que o intervalo de bootstrap
+# da variação não contém zero.
+def tabela_variacao(antes, depois, confianca=0.95, reamostras=10_000, semente=0):
+    linhas = list(dict.fromkeys([*antes.index, *depois.index]))
+    colunas = list(dict.fromkeys([*antes.columns, *depois.columns]))
+    antes = antes.reindex(index=linhas, columns=colunas, fill_value=0).fillna(0)
+    depois = depois.reindex(index=linhas, columns=colunas, fill_value=0).fillna(0)
+
+    poisson = variacao_poisson(antes, depois, confianca)
+    bootstrap = bootstrap_variacao(antes, depois, confianca, reamostras, semente)
+    colunas_saida = {
+        'QTD_ANTES': antes.to_numpy(),
+        'QTD_DEPOIS': depois.to_numpy(),
+        'VARIACAO': (depois - antes).to_numpy(),
+        'VARIACAO_INF_POISSON': poisson[0],
+        'VARIACAO_SUP_POISSON': poisson[1],
+        'VARIACAO_INF_BOOTSTRAP': bootstrap['variacao'][0],
+        'VARIACAO_SUP_BOOTSTRAP': bootstrap['variacao'][1],
+        'PARTICIPACAO_ANTES': _participacao(antes.to_numpy()),
+        'PARTICIPACAO_DEPOIS': _participacao(depois.to_numpy()),
+    }
+    colunas_saida['VARIACAO_PARTICIPACAO'] = colunas_saida['PARTICIPACAO_DEPOIS'] - colunas_saida['PARTICIPACAO_ANTES']
+    colunas_saida['VARIACAO_PARTICIPACAO_INF'] = bootstrap['participacao'][0]
+    colunas_saida['VARIACAO_PARTICIPACAO_SUP'] = bootstrap['participacao'][1]
+
+    tabela = pd.DataFrame({
+        nome: pd.DataFrame(valores, index=antes.index, columns=antes.columns).stack() for nome, valores in colunas_saida.items()
+    })
+    tabela['SIGNIFICATIVA'] = (tabela['VARIACAO_INF_BOOTSTRAP'] > 0) | (tabela['VARIACAO_SUP_BOOTSTRAP'] < 0)
+    return tabela
+
+
+# O mesmo a partir das contagens em formato longo de agregacao.contar (NU_ANO,
+# dimensões e QTD), entre os anos antes e depois: a última dimensão é a
+# categoria e as anteriores formam o grupo (sem elas, um grupo só)
+def variacao_entre_anos(contagens, antes, depois, confianca=0.95, reamostras=10_000, semente=0):
+    dimensoes = [coluna for coluna in contagens.columns if coluna not in ('NU_ANO', 'QTD')]
+    grupos, categoria = dimensoes[:-1], dimensoes[-1]
+
+    def tabela(ano):
+        do_ano = contagens[contagens['NU_ANO'] == ano]
+        if grupos:
+            return do_ano.pivot_table(index=grupos, columns=categoria, values='QTD', aggfunc='sum', fill_value=0)
+        return do_ano.groupby(categoria)['QTD'].sum().to_frame('TOTAL').T
+
+    variacoes = tabela_variacao(tabela(antes), tabela(depois), confianca, reamostras, semente)
+    return variacoes if grupos else variacoes.droplevel(0)
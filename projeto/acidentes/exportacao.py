@@ -0,0 +1,145 @@
+# Exportação das tabelas agregadas (contagens por município, faixa etária e
+# tipo de acidente e as ocupações mais afetadas) para quem quiser usá-las sem
+# rodar a análise nem abrir o banco. Cada tabela é gravada em Arrow IPC
+# (pasta/<nome>.arrow, sem compressão, para ser mapeada na memória: só as
+# colunas lidas saem do disco) e em Parquet (pasta/<nome>.parquet, compactado,
+# para guardar ou enviar), e o manifesto (pasta/manifesto.json) descreve os
+# filtros usados e o esquema de cada tabela. As colunas de texto vão com
+# dicionário: cada valor distinto é guardado uma vez.
+import datetime
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from acidentes.agregacao import amostra_ativa, contar, top_cargos_por_municipio
+
+MANIFESTO = 'manifesto.json'
+VERSAO = 1
+
+DESCRICOES = {
+    'NU_ANO': 'ano da notificação',
+    'ID_MUNICIP': 'código IBGE do município (6 dígitos)',
+    'FAIXA_ETARIA': 'faixa etária do acidentado',
+    'TIPO_ACIDENTE': 'tipo de acidente, pela CID-10 da causa (CID_ACID)',
+    'CARGO': 'descrição da ocupação (CBO)',
+    'QTD': 'quantidade de acidentes',
+    'QTD_ERRO': 'erro padrão de QTD (só no modo aproximado)',
+    'QTD_MAX': 'limite superior do intervalo de 95% de QTD (só no modo aproximado)',
+}
+
+
+def _municipio(conn, anos, municipios, uf, fonte):
+    return contar(conn, ['ID_MUNICIP'], anos, municipios, uf, fonte)
+
+
+def _faixa_etaria(conn, anos, municipios, uf, fonte):
+    return contar(conn, ['ID_MUNICIP', 'FAIXA_ETARIA'], anos, municipios, uf, fonte)
+
+
+def _tipo_acidente(conn, anos, municipios, uf, fonte):
+    return contar(conn, ['ID_MUNICIP', 'TIPO_ACIDENTE'], anos, municipios, uf, fonte)
+
+
+def _cargos_municipio(conn, anos, municipios, uf, fonte):
+    return top_cargos_por_municipio(conn, anos, municipios, uf, 5, fonte)
+
+
+# Tipos fixos das colunas numéricas, os mesmos em qualquer banco ou fonte;
+# texto vira dicionário de string
+TIPOS = {'NU_ANO': pa.int16(), 'ID_MUNICIP': pa.int32(), 'QTD': pa.int64(), 'QTD_ERRO': pa.float64(), 'QTD_MAX': pa.float64()}
+
+
+# Nome -> (descrição, função que devolve a tabela em formato longo)
+AGREGADOS = {
+    'municipio': ('acidentes por ano e município', _municipio),
+    'faixa_etaria': ('acidentes por ano, município e faixa etária', _faixa_etaria),
+    'tipo_acidente': ('acidentes por ano, município e tipo de acidente', _tipo_acidente),
+    'cargos_municipio': ('as 5 ocupações com mais acidentes em cada município e ano', _cargos_municipio),
+}
+# Tabelas que precisam da tabela de ocupações (ocupacoes.py) na conexão
+AGREGADOS_CARGOS = {'cargos_municipio'}
+
+
+# DataFrame -> tabela Arrow com o texto em dicionário e a descrição de cada
+# coluna nos metadados do esquema (no lugar dos metadados do pandas)
+def _tabela_arrow(nome, dados):
+    tabela = pa.Table.from_pandas(dados, preserve_index=False)
+    colunas = [
+        coluna.cast(TIPOS[nome]) if nome in TIPOS
+        else coluna.cast(pa.string()).dictionary_encode() if pa.types.is_string(coluna.type) or pa.types.is_large_string(coluna.type)
+        else coluna
+        for nome, coluna in zip(tabela.column_names, tabela.columns)
+    ]
+    campos = [
+        pa.field(campo.name, coluna.type, metadata={'descricao': DESCRICOES.get(campo.name, '')})
+        for campo, coluna in zip(tabela.schema, colunas)
+    ]
+    metadados = {'tabela': nome, 'descricao': AGREGADOS[nome][0]}
+    return pa.Table.from_arrays(colunas, schema=pa.schema(campos, metadata=metadados))
+
+
+# Grava num arquivo temporário e troca no fim, para quem estiver lendo a
+# pasta nunca ver um arquivo pela metade
+def _gravar(caminho, gravar):
+    gravar(caminho + '.tmp')
+    os.replace(caminho + '.tmp', caminho)
+
+
+def _gravar_arrow(tabela, caminho):
+    with pa.OSFile(caminho, 'wb') as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+
+
+def _gravar_json(dados, caminho):
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False, indent=2)
+
+
+def _esquema(tabela):
+    return [
+        {'nome': campo.name, 'tipo': str(campo.type), 'descricao': campo.metadata[b'descricao'].decode()}
+        for campo in tabela.schema
+    ]
+
+
+# Exporta as tabelas pedidas (padrão: todas as de AGREGADOS) para a pasta e
+# grava o manifesto por último. Devolve o manifesto.
+def exportar_agregados(conn, pasta, anos, municipios=None, uf=None, fonte='bruto', tabelas=None, compressao='zstd'):
+    os.makedirs(pasta, exist_ok=True)
+    amostra = amostra_ativa()
+    manifesto = {
+        'versao': VERSAO,
+        'gerado_em': datetime.datetime.now().isoformat(timespec='seconds'),
+        'filtros': {'anos': list(anos), 'municipios': None if municipios is None else list(municipios), 'uf': uf, 'fonte': fonte},
+        'aproximado': amostra is not None,
+        'amostra': amostra['taxa'] if amostra else None,
+        'tabelas': {},
+    }
+    for nome in tabelas or AGREGADOS:
+        descricao, funcao = AGREGADOS[nome]
+        tabela = _tabela_arrow(nome, funcao(conn, anos, municipios, uf, fonte))
+        _gravar(os.path.join(pasta, f'{nome}.arrow'), lambda caminho: _gravar_arrow(tabela, caminho))
+        _gravar(os.path.join(pasta, f'{nome}.parquet'), lambda caminho: pq.write_table(tabela, caminho, compression=compressao))
+        manifesto['tabelas'][nome] = {
+            'descricao': descricao,
+            'linhas': tabela.num_rows,
+            'arquivos': {'arrow': f'{nome}.arrow', 'parquet': f'{nome}.parquet'},
+            'colunas': _esquema(tabela),
+        }
+    _gravar(os.path.join(pasta, MANIFESTO), lambda caminho: _gravar_json(manifesto, caminho))
+    return manifesto
+
+
+def ler_manifesto(pasta):
+    with open(os.path.join(pasta, MANIFESTO), encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+# Lê uma tabela exportada mapeando o .arrow na memória: nada é copiado, e só
+# as páginas das colunas pedidas são lidas do disco
+def ler_agregado(pasta, nome, colunas=None):
+    with pa.memory_map(os.path.join(pasta, ler_manifesto(pasta)['tabelas'][nome]['arquivos']['arrow'])) as arquivo:
+        tabela = pa.ipc.open_file(arquivo).read_all()
+    return tabela.select(colunas) if colunas else tabela
@@ -0,0 +1,230 @@
+# Funções de desenho usadas na renderização em lote (renderizacao.py).
+# Cada uma recebe os dados já agregados e os parâmetros de estilo e desenha
+# numa figura nova do pyplot; quem chama salva e fecha a figura.
+# Este módulo só é importado na hora de desenhar.
+import matplotlib.pyplot as plt
+
+
+# Porcentagem de acidentes de cada cidade em relação ao total
+def calcular_porcentagem(acidentes):
+    total_acidentes = acidentes.sum()
+    return (acidentes / total_acidentes) * 100
+
+
+def _cor(cores, i):
+    return cores[i % len(cores)]
+
+
+# Municípios nas linhas e anos nas colunas. erros, opcional, tem as barras de
+# erro no formato do yerr do pandas: [abaixo, acima] para cada coluna
+def barras_comparacao_anos(dados, titulo, erros=None):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    dados.plot(kind='bar', ax=ax, color=[_cor(['purple', 'pink'], i) for i in range(len(dados.columns))], alpha=0.8,
+               yerr=erros, capsize=4)
+    ax.set_title(titulo)
+    ax.set_ylabel('Quantidade de Acidentes')
+    ax.set_xlabel('Municípios')
+    ax.tick_params(axis='x', rotation=0)
+    ax.legend(title='Ano')
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+
+
+def linhas_comparacao_cidades(dados, titulo, erros=None):
+    plt.figure(figsize=(10, 6))
+
+    for i, ano in enumerate(dados.columns):
+        acidentes = dados[ano]
+        plt.errorbar(acidentes.index, acidentes, yerr=erros[i] if erros else None, capsize=4,
+                     marker='o', color=_cor(['purple', 'hotpink'], i), label=str(ano), linestyle='-', linewidth=2, markersize=8)
+
+        for cidade, porcentagem in calcular_porcentagem(acidentes).items():
+            plt.text(cidade, acidentes[cidade], f'{porcentagem:.1f}%', fontsize=12, ha='center', va='bottom', color='black')
+
+    plt.title(titulo, fontsize=14)
+    plt.xlabel('Cidades', fontsize=12)
+    plt.ylabel('Quantidade de Acidentes', fontsize=12)
+    plt.legend(title="Ano", loc="upper left")
+    plt.grid(True, axis='y', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+
+
+# Linhas (cidade, faixa etária) e anos nas colunas; um painel por cidade.
+# erros, opcional: as barras de erro de cada cidade, como em barras_comparacao_anos
+def barras_faixas_etarias(dados, titulo, erros=None):
+    cidades = list(dict.fromkeys(dados.index.get_level_values(0)))
+    fig, axes = plt.subplots(nrows=1, ncols=len(cidades), figsize=(6 * len(cidades), 6), sharey=True, squeeze=False)
+    for ax, cidade in zip(axes[0], cidades):
+        dados.loc[cidade].plot(kind='bar', ax=ax, color=['skyblue', 'orange'], alpha=0.8,
+                               yerr=erros[cidade] if erros else None, capsize=4)
+        ax.set_title(f'Faixas Etárias - {cidade}')
+        ax.set_ylabel('Quantidade de Acidentes')
+        ax.set_xlabel('Faixa Etária')
+        ax.legend(title='Ano')
+        ax.grid(axis='x', linestyle='--', alpha=0.7)
+
+    plt.suptitle(titulo, fontsize=16)
+    plt.tight_layout(rect=[0, 0, 1, 0.95])
+
+
+def pizza_tipos_acidente(dados, titulo):
+    plt.figure(figsize=(8, 6))
+    wedges, texts, autotexts = plt.pie(
+        dados,
+        autopct='%1.1f%%',
+        startangle=90,
+        textprops=dict(color="w"),
+        colors=plt.cm.tab20.colors[:len(dados)]
+    )
+
+    plt.legend(
+        wedges,
+        dados.index,
+        title="Tipos de Acidentes",
+        loc="center left",
+        bbox_to_anchor=(1, 0.5),
+        fontsize=10
+    )
+
+    plt.title(titulo)
+    plt.tight_layout()
+
+
+# Linhas (ano, cidade) e os tipos de acidente mais comuns de cada cidade nas
+# colunas (vazio para os demais); um painel por ano
+def barras_top_tipos(dados, titulo, atividades):
+    anos = list(dict.fromkeys(dados.index.get_level_values(0)))
+    fig, axes = plt.subplots(nrows=1, ncols=len(anos), figsize=(9 * len(anos), 8), sharey=True, squeeze=False)
+
+    for ax, ano in zip(axes[0], anos):
+        top_acidentes = dados.loc[ano].dropna(axis=1, how='all')
+        top_acidentes.plot(kind='bar', ax=ax, color=['skyblue', 'orange', 'green', 'hotpink', 'purple'], alpha=0.8)
+        ax.set_title(f'Tipos de Acidentes Mais Comuns em {ano}')
+        ax.set_ylabel('Número de Acidentes')
+        ax.set_xlabel('Cidades')
+        ax.set_xticklabels(top_acidentes.index, rotation=0)
+        ax.grid(True, axis='y', linestyle='--', alpha=0.7)
+
+        for i, cidade in enumerate(top_acidentes.index):
+            atividade = atividades.get(cidade)
+            if atividade:
+                ax.text(i, top_acidentes.iloc[i].max() + 1, f'Atividade: {atividade}', ha='center', color='black')
+
+    plt.suptitle(titulo, fontsize=16)
+    plt.tight_layout(rect=[0, 0, 1, 0.96])
+
+
+# Cidades nas linhas; colunas com os acidentes de cada ano, densidade e pib
+def barras_densidade_pib(dados, titulo, anos):
+    fig, ax1 = plt.subplots(figsize=(10, 6))
+
+    largura = 0.2
+    posicoes = range(len(dados))
+
+    for i, ano in enumerate(anos):
+        ax1.bar([p + (i - 1) * largura for p in posicoes], dados[f'acidentes_{ano}'], largura, label=f'Acidentes {ano}', color=_cor(['purple', 'pink'], i))
+
+    ax2 = ax1.twinx()
+    barras_densidade = ax2.bar([p + (len(anos) - 1) * largura for p in posicoes], dados['densidade'], largura, label='Densidade Populacional', color='green', alpha=0.6)
+
+    ax3 = ax1.twinx()
+    ax3.spines['right'].set_position(('outward', 60))
+    barras_pib = ax3.bar([p + len(anos) * largura for p in posicoes], dados['pib'] / 1000000, largura, label='PIB (milhões)', color='orange', alpha=0.6)
+
+    ax1.set_ylabel('Quantidade de Acidentes')
+    ax1.set_xlabel('Cidade')
+    ax1.set_title(titulo)
+    ax1.set_xticks(posicoes)
+    ax1.set_xticklabels(dados.index)
+
+    ax2.set_ylabel('Densidade Populacional (hab/km²)')
+    ax3.set_ylabel('PIB (R$ milhões)')
+
+    handles, labels = ax1.get_legend_handles_labels()
+    handles.extend([barras_densidade, barras_pib])
+    labels.extend(['Densidade Populacional', 'PIB (milhões)'])
+
+    ax1.legend(handles=handles, labels=labels, loc='upper left')
+
+    fig.tight_layout()
+
+
+# Municípios nas linhas (do maior para o menor) e anos nas colunas, com os
+# acidentes por 100 mil habitantes
+def barras_taxas(dados, titulo):
+    fig, ax = plt.subplots(figsize=(10, max(4, 0.4 * len(dados))))
+    dados.plot(kind='barh', ax=ax, color=[_cor(['purple', 'pink'], i) for i in range(len(dados.columns))], alpha=0.8)
+    ax.invert_yaxis()
+    ax.set_title(titulo)
+    ax.set_xlabel('Acidentes por 100 mil habitantes')
+    ax.set_ylabel('Município')
+    ax.legend(title='Ano')
+    ax.grid(axis='x', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+
+
+# Cargos nas linhas e anos nas colunas (vazio se o cargo não está no top do ano)
+def barras_top_cargos_anos(dados, titulo):
+    fig, axes = plt.subplots(1, len(dados.columns), figsize=(8 * len(dados.columns), 8), sharey=True, squeeze=False)
+
+    for i, (ax, ano) in enumerate(zip(axes[0], dados.columns)):
+        dados[ano].dropna().sort_values(ascending=False).plot(kind='bar', ax=ax, color=_cor(['purple', 'pink'], i), alpha=0.8)
+        ax.set_title(f'Cargos Mais Afetados ({ano})')
+        ax.set_xlabel('Cargo')
+        ax.tick_params(axis='x', rotation=45)
+    axes[0][0].set_ylabel('Número de Acidentes')
+
+    plt.suptitle(titulo, fontsize=16)
+    plt.tight_layout(rect=[0, 0, 1, 0.95])
+
+
+def barras_comparacao_cargos(dados, titulo):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    dados.plot(kind='bar', ax=ax, color=['purple', 'pink'], alpha=0.8)
+    ax.set_title(titulo)
+    ax.set_xlabel('Cargo')
+    ax.set_ylabel('Número de Acidentes')
+    ax.tick_params(axis='x', rotation=45)
+    ax.legend(title='Ano')
+    plt.tight_layout()
+
+
+def barras_cargos(dados, titulo):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    dados.plot(kind='bar', ax=ax, color=['purple', 'pink'], alpha=0.8)
+
+    ax.set_title(titulo, fontsize=14)
+    ax.set_ylabel('Número de Acidentes', fontsize=12)
+    ax.set_xlabel('Cargo', fontsize=2)
+    ax.tick_params(axis='x', rotation=45)
+    ax.legend(title='Ano', fontsize=5)
+
+    plt.tight_layout()
+
+
+def barras_faixas_por_cargo(dados, titulo):
+    fig, ax = plt.subplots(figsize=(12, 8))
+    dados.plot(kind='bar', ax=ax, alpha=0.8)
+
+    ax.set_title(titulo, fontsize=16)
+    ax.set_ylabel('Quantidade de Acidentes', fontsize=12)
+    ax.set_xlabel('Cargo', fontsize=12)
+    ax.legend(title='Ano', fontsize=10)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+    plt.tight_layout()
+
+
+DESENHOS = {
+    'barras_comparacao_anos': barras_comparacao_anos,
+    'linhas_comparacao_cidades': linhas_comparacao_cidades,
+    'barras_faixas_etarias': barras_faixas_etarias,
+    'pizza_tipos_acidente': pizza_tipos_acidente,
+    'barras_top_tipos': barras_top_tipos,
+    'barras_densidade_pib': barras_densidade_pib,
+    'barras_taxas': barras_taxas,
+    'barras_top_cargos_anos': barras_top_cargos_anos,
+    'barras_comparacao_cargos': barras_comparacao_cargos,
+    'barras_cargos': barras_cargos,
+    'barras_faixas_por_cargo': barras_faixas_por_cargo,
+}
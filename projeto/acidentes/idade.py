@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from acidentes.categorias import faixas_etarias
+
+# Unidade da idade no NU_IDADE_N do DATASUS: o primeiro dígito do código
+# indica a unidade e os três últimos o valor (ex.: 4025 = 25 anos, 3006 = 6 meses)
+HORAS, DIAS, MESES, ANOS, ANOS_ACIMA_DE_100 = 1, 2, 3, 4, 5
+
+
+# Converte a coluna NU_IDADE_N inteira para idade em anos completos.
+# Códigos inválidos ou ausentes viram <NA>.
+def decodificar_idade(codigos):
+    codigo = pd.to_numeric(codigos, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    unidade = codigo // 1000
+    valor = codigo % 1000
+    idade = np.select(
+        [unidade == ANOS, unidade == MESES, (unidade == HORAS) | (unidade == DIAS), unidade == ANOS_ACIMA_DE_100],
+        [valor, valor // 12, 0, 100 + valor],
+        default=np.nan,
+    )
+    return pd.Series(idade, index=codigos.index, name='IDADE').astype('Int16')
+
+
+# Classifica idades em faixas numa única operação, devolvendo uma coluna
+# categórica ordenada. faixas segue o formato de categorias.faixas_etarias.
+def atribuir_faixas(idades, faixas=faixas_etarias):
+    limites = [-np.inf] + [maximo if maximo is not None else np.inf for _, maximo in faixas]
+    rotulos = [rotulo for rotulo, _ in faixas]
+    return pd.cut(idades.astype('float64'), bins=limites, labels=rotulos, right=True).rename('FAIXA_ETARIA')
+
+
+def faixa_etaria_da_coluna(codigos, faixas=faixas_etarias):
+    return atribuir_faixas(decodificar_idade(codigos), faixas)
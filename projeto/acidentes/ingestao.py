@@ -0,0 +1,80 @@
+import os
+
+import duckdb
+import pandas as pd
+
+from acidentes.categorias import texto_sql
+
+# Colunas usadas pelas análises e os tipos compactos de cada uma
+COLUNAS = {
+    'ID_MUNICIP': 'Int32',
+    'NU_IDADE_N': 'Int16',
+    'CID_ACID': 'category',
+    'ID_OCUPA_N': 'category',
+    'NU_ANO': 'Int16',
+}
+
+# Cópias já lidas, indexadas por (caminho, data de modificação, tamanho)
+_em_memoria = {}
+
+
+def _chave(caminho):
+    caminho = os.path.abspath(caminho)
+    info = os.stat(caminho)
+    return caminho, info.st_mtime_ns, info.st_size
+
+
+def _arquivo_parquet(pasta_cache, chave):
+    nome = os.path.splitext(os.path.basename(chave[0]))[0]
+    return os.path.join(pasta_cache, f'{nome}_{chave[1]}_{chave[2]}.parquet')
+
+
+def _ler_parquet(arquivo):
+    return duckdb.read_parquet(arquivo).df().astype(COLUNAS)
+
+
+def _gravar_parquet(dados, arquivo):
+    conn = duckdb.connect()
+    conn.register('dados', dados)
+    conn.execute(f'COPY dados TO {texto_sql(arquivo)} (FORMAT PARQUET)')
+    conn.close()
+
+
+# Lê um CSV ACGRBR uma única vez, só com as colunas usadas e com tipos compactos.
+# Chamadas seguintes para o mesmo arquivo (sem alterações) devolvem a cópia em
+# memória; com pasta_cache, a cópia colunar em Parquet também sobrevive entre
+# execuções. O DataFrame devolvido é compartilhado: filtre antes de alterar.
+def carregar_csv(caminho, pasta_cache=None):
+    chave = _chave(caminho)
+    if chave in _em_memoria:
+        return _em_memoria[chave]
+
+    arquivo = _arquivo_parquet(pasta_cache, chave) if pasta_cache else None
+    if arquivo and os.path.exists(arquivo):
+        dados = _ler_parquet(arquivo)
+    else:
+        dados = pd.read_csv(caminho, usecols=list(COLUNAS), dtype=COLUNAS)
+        if arquivo:
+            os.makedirs(pasta_cache, exist_ok=True)
+            _gravar_parquet(dados, arquivo)
+
+    _em_memoria[chave] = dados
+    return dados
+
+
+# Descarta as cópias em memória de carregar_csv (a próxima leitura volta ao
+# arquivo ou ao cache em Parquet)
+def esquecer_copias():
+    _em_memoria.clear()
+
+
+# Lê o CSV em blocos de até tamanho_bloco linhas, com as mesmas colunas e tipos
+# de carregar_csv, sem guardar nada em memória: para arquivos (como o nacional)
+# que não cabem inteiros. Use como iterador, de preferência num `with`.
+def ler_csv_em_blocos(caminho, tamanho_bloco=500_000):
+    return pd.read_csv(caminho, usecols=list(COLUNAS), dtype=COLUNAS, chunksize=tamanho_bloco)
+
+
+# Carrega vários anos de uma vez: {2022: './banco/ACGRBR22.csv', ...}
+def carregar_anos(arquivos, pasta_cache=None):
+    return {ano: carregar_csv(caminho, pasta_cache) for ano, caminho in arquivos.items()}
@@ -0,0 +1,147 @@
+# Medição por etapa das execuções (tempo de relógio, tempo de CPU, pico de
+# memória e linhas de entrada e saída), com um relatório JSON por execução.
+#
+#     with execucao('relatorios_execucao', perfil=True):
+#         with etapa('carga') as medida:
+#             dados = carregar_anos(arquivos)
+#             medida['saida'] = sum(len(d) for d in dados.values())
+#
+# Fora de uma execução, etapa() só devolve um dicionário descartável: nada é
+# medido nem importado. O pico de memória vem do tracemalloc (alocações do
+# Python, pandas e NumPy; não inclui a memória interna do DuckDB). O tempo de
+# CPU inclui o dos processos filhos já encerrados (ex.: o pool de renderização).
+# Ligada, o tracemalloc deixa as etapas um pouco mais lentas. Com perfil=True
+# cada etapa de primeiro nível roda também sob o cProfile e o perfil da mais
+# lenta é gravado ao lado do relatório.
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Execução ativa; None quando a instrumentação está desligada
+_execucao = None
+
+
+def ativa():
+    return _execucao is not None
+
+
+def _cpu():
+    tempos = os.times()
+    return tempos.user + tempos.system + tempos.children_user + tempos.children_system
+
+
+@contextmanager
+def etapa(nome, entrada=None):
+    medida = {'entrada': entrada, 'saida': None}
+    if _execucao is None:
+        yield medida
+        return
+
+    import tracemalloc
+
+    abertas = _execucao['abertas']
+    # o pico é zerado no início de cada etapa; as etapas abertas guardam o
+    # pico que tinham até aqui para não perdê-lo
+    memoria, pico = tracemalloc.get_traced_memory()
+    for aberta in abertas:
+        aberta['pico'] = max(aberta['pico'], pico)
+    tracemalloc.reset_peak()
+
+    perfil = None
+    if _execucao['perfil'] and not abertas:
+        import cProfile
+        perfil = cProfile.Profile()
+
+    registro = {'nivel': len(abertas), 'ordem': _execucao['iniciadas'], 'memoria_inicio': memoria, 'pico': memoria}
+    _execucao['iniciadas'] += 1
+    abertas.append(registro)
+    inicio, inicio_cpu = time.perf_counter(), _cpu()
+    if perfil:
+        perfil.enable()
+    try:
+        yield medida
+    finally:
+        if perfil:
+            perfil.disable()
+        tempo, cpu = time.perf_counter() - inicio, _cpu() - inicio_cpu
+        abertas.pop()
+        pico = max(registro['pico'], tracemalloc.get_traced_memory()[1])
+        for aberta in abertas:
+            aberta['pico'] = max(aberta['pico'], pico)
+
+        _execucao['etapas'].append((registro['ordem'], {
+            'nome': nome,
+            'nivel': registro['nivel'],
+            'tempo': tempo,
+            'cpu': cpu,
+            'memoria_pico': pico - registro['memoria_inicio'],
+            'linhas_entrada': medida['entrada'],
+            'linhas_saida': medida['saida'],
+        }))
+        if perfil and tempo > _execucao['perfil_tempo']:
+            _execucao['perfil_tempo'] = tempo
+            _execucao['perfil_etapa'] = nome
+            _execucao['perfil_dados'] = perfil
+
+
+# Pico de memória residente do processo (None onde o módulo resource não existe)
+def _memoria_maxima_processo():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss vem em KiB no Linux e em bytes no macOS
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo if sys.platform == 'darwin' else maximo * 1024
+
+
+def _resumo(etapas):
+    return '\n'.join(
+        f"{'  ' * e['nivel']}{e['nome']:<{30 - 2 * e['nivel']}} {e['tempo']:9.3f} s {e['cpu']:9.3f} s CPU "
+        f"{e['memoria_pico'] / 2**20:9.1f} MiB"
+        for e in etapas
+    )
+
+
+# Liga a instrumentação durante o bloco e grava o relatório em
+# pasta/<nome>_<data e hora>.json (e o .prof da etapa mais lenta, com perfil=True).
+# Devolve, no `as`, o dicionário do relatório, que é preenchido no fim do bloco.
+@contextmanager
+def execucao(pasta, nome='execucao', perfil=False, resumo=print):
+    global _execucao
+    import tracemalloc
+
+    if _execucao is not None:
+        raise RuntimeError('Já existe uma execução instrumentada em andamento')
+
+    relatorio = {'nome': nome, 'inicio': datetime.now().isoformat(timespec='seconds')}
+    _execucao = {'abertas': [], 'etapas': [], 'iniciadas': 0, 'perfil': perfil, 'perfil_tempo': -1, 'perfil_etapa': None, 'perfil_dados': None}
+    ja_rastreando = tracemalloc.is_tracing()
+    if not ja_rastreando:
+        tracemalloc.start()
+    inicio, inicio_cpu = time.perf_counter(), _cpu()
+    try:
+        yield relatorio
+    finally:
+        atual, _execucao = _execucao, None
+        relatorio['tempo'] = time.perf_counter() - inicio
+        relatorio['cpu'] = _cpu() - inicio_cpu
+        if not ja_rastreando:
+            tracemalloc.stop()
+        relatorio['memoria_maxima_processo'] = _memoria_maxima_processo()
+        # as etapas são registradas ao terminar; no relatório ficam na ordem de início
+        relatorio['etapas'] = [medida for _, medida in sorted(atual['etapas'], key=lambda e: e[0])]
+
+        os.makedirs(pasta, exist_ok=True)
+        base = os.path.join(pasta, f"{nome}_{datetime.now():%Y%m%d-%H%M%S}")
+        if atual['perfil_dados'] is not None:
+            relatorio['perfil'] = {'etapa': atual['perfil_etapa'], 'arquivo': base + '.prof'}
+            atual['perfil_dados'].dump_stats(base + '.prof')
+        with open(base + '.json', 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+        relatorio['arquivo'] = base + '.json'
+        if resumo:
+            resumo(_resumo(relatorio['etapas']))
@@ -0,0 +1,68 @@
+import csv
+import os
+
+import pandas as pd
+
+OCUPACOES = 'ocupacoes'
+
+
+# Lê o OCUPANET.csv. Cada linha do arquivo veio inteira entre aspas, com as
+# aspas internas dobradas ("1,""RECEPCIONISTA"",""422115"""), então cada linha
+# é desfeita duas vezes pelo leitor de CSV. Devolve as colunas CODIGO (código
+# CBO, texto) e DESCRICAO.
+def ler_ocupacoes(caminho, encoding='utf-8-sig'):
+    linhas = []
+    with open(caminho, encoding=encoding, newline='') as arquivo:
+        for campos in csv.reader(arquivo):
+            if len(campos) == 1:
+                campos = next(csv.reader([campos[0]]))
+            linhas.append(campos)
+
+    cabecalho = [coluna.strip() for coluna in linhas[0]]
+    dados = pd.DataFrame(linhas[1:], columns=cabecalho)
+    return pd.DataFrame({
+        'CODIGO': dados['ID_OCUPA_N'].str.strip(' ,'),
+        'DESCRICAO': dados['Descricao'].str.strip(),
+    }).drop_duplicates('CODIGO')
+
+
+# Arquivo de onde a tabela de ocupações foi lida: caminho, data de modificação
+# e tamanho
+ORIGEM = 'ocupacoes_origem'
+
+
+def _origem(caminho):
+    info = os.stat(caminho)
+    return os.path.abspath(caminho), info.st_mtime_ns, info.st_size
+
+
+# Grava a tabela de ocupações no banco, ao lado de dadosacidentetrabalho, com
+# chave primária (e portanto índice) no código. O arquivo só é lido de novo
+# se tiver mudado (caminho, data de modificação ou tamanho) desde a última
+# carga, ou com recarregar=True; se ele não existir, fica a tabela já
+# carregada. Devolve as ocupações carregadas (0 se nada mudou).
+def carregar_ocupacoes(conn, caminho, recarregar=False):
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {OCUPACOES} (CODIGO VARCHAR PRIMARY KEY, DESCRICAO VARCHAR)')
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {ORIGEM} (ARQUIVO VARCHAR, MODIFICADO BIGINT, TAMANHO BIGINT)')
+    carregada = conn.execute(f'SELECT COUNT(*) FROM {OCUPACOES}').fetchone()[0] > 0
+    if carregada and not os.path.exists(caminho):
+        return 0
+    origem = _origem(caminho)
+    if carregada and not recarregar and conn.execute(f'SELECT * FROM {ORIGEM}').fetchone() == origem:
+        return 0
+
+    ocupacoes = ler_ocupacoes(caminho)
+    conn.register('ocupacoes_csv', ocupacoes)
+    conn.begin()
+    try:
+        conn.execute(f'DELETE FROM {OCUPACOES}')
+        conn.execute(f'INSERT INTO {OCUPACOES} SELECT CODIGO, DESCRICAO FROM ocupacoes_csv')
+        conn.execute(f'DELETE FROM {ORIGEM}')
+        conn.execute(f'INSERT INTO {ORIGEM} VALUES (?, ?, ?)', list(origem))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.unregister('ocupacoes_csv')
+    return len(ocupacoes)
@@ -0,0 +1,147 @@
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import unicodedata
+
+from acidentes.categorias import municipios_nome
+
+# Arquivo, dentro da pasta do painel, com o hash de cada imagem e seção geradas
+MANIFESTO = '.painel.json'
+
+# Seções do painel, na ordem da página: (chave, padrão do arquivo gerado
+# pelas análises, título, classe css). Padrões com o grupo 'municipio' geram
+# uma seção por município; o grupo 'ano', quando existe, ordena as imagens.
+SECOES = [
+    ('qtd_ac', r'qtd_ac\.png', 'Comparação entre a quantidade de acidentes por ano', 'qtd_ac'),
+    ('comp_qtd_acid', r'comp_qtd_acid\.png', 'Comparação entre a quantidade de acidentes nas cidades', 'qtd_ac_comp'),
+    ('faixa_etaria', r'faixa_etaria\.png', 'Comparação entre a faixa etária afetada', 'faixa_etaria'),
+    ('acid_comuns', r'graficos_acidentes_(?P<municipio>.+)_(?P<ano>\d{4})\.png', 'Acidentes mais comuns em {municipio}', 'acid_comuns'),
+    ('tipos_acid_comuns', r'tipos_acid_comuns\.png', 'Comparação de acidentes mais comuns entre as cidades e foco econômico', 'tipos_acid'),
+    ('comp_den_acid_pib', r'comp_den_acid_pib\.png', 'Comparação da quantidade de acidentes com densidade demográfica e PIB', 'faixa_etaria'),
+    ('taxas_acidentes', r'taxas_acidentes\.png', 'Municípios com mais acidentes por 100 mil habitantes', 'faixa_etaria'),
+    ('cargos_afetados', r'cargos_afetados_(?P<municipio>\d+)\.png', 'Cargos mais afetados na cidade de {municipio}', 'faixa_etaria'),
+    ('faixa_etaria_cargo', r'faixa_etaria_cargo_(?P<municipio>\d+)\.png', 'Faixa etária e cargos - {municipio}', 'faixa_etaria'),
+]
+
+CABECALHO = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <link rel="stylesheet" href="./styles.css">
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Poppins:ital,wght@0,100;0,200;0,300;0,400;0,500;0,600;0,700;0,800;0,900;1,100;1,200;1,300;1,400;1,500;1,600;1,700;1,800;1,900&display=swap" rel="stylesheet">
+    <title>Análise DataSUS</title>
+</head>
+<body>
+    <div class="content">
+"""
+
+RODAPE = """    </div>
+</body>
+</html>
+"""
+
+
+# Nome estável para o asset: sem acentos, minúsculo e sem espaços
+def nome_asset(arquivo):
+    nome = unicodedata.normalize('NFKD', arquivo).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9._-]+', '_', nome.lower())
+
+
+def _nome_municipio(valor):
+    if valor.isdigit():
+        return municipios_nome.get(int(valor), valor)
+    return valor
+
+
+def _hash_arquivo(caminho):
+    with open(caminho, 'rb') as arquivo:
+        return hashlib.sha256(arquivo.read()).hexdigest()
+
+
+# Agrupa os arquivos gerados pelas análises nas seções do painel.
+# Devolve uma lista de (id da seção, título, classe css, [arquivos])
+def descobrir_secoes(pasta_graficos):
+    arquivos = sorted(os.listdir(pasta_graficos))
+    secoes = []
+    for chave_secao, padrao, titulo, classe in SECOES:
+        grupos = {}
+        for arquivo in arquivos:
+            encontrado = re.fullmatch(padrao, arquivo)
+            if encontrado:
+                partes = encontrado.groupdict()
+                chave = partes.get('municipio')
+                grupos.setdefault(chave, []).append((partes.get('ano', ''), arquivo))
+        for chave in sorted(grupos, key=lambda c: _nome_municipio(c) if c else ''):
+            imagens = [arquivo for _, arquivo in sorted(grupos[chave])]
+            nome = _nome_municipio(chave) if chave else None
+            identificador = nome_asset(f'{chave_secao}_{nome}' if nome else chave_secao)
+            secoes.append((identificador, titulo.format(municipio=nome), classe, imagens))
+    return secoes
+
+
+def _html_secao(titulo, classe, assets):
+    imagens = ''.join(f'                <img src="./assets/{asset}"/>\n' for asset in assets)
+    return (
+        '        <div class="container">\n'
+        f'            <span>{html.escape(titulo)}</span>\n'
+        f'            <div class="{classe}">\n'
+        f'{imagens}'
+        '            </div>\n'
+        '        </div>\n'
+    )
+
+
+# Gera index.html e assets/ do painel a partir dos gráficos em pasta_graficos.
+# Só as imagens cujo conteúdo mudou são copiadas, index.html só é reescrito se
+# alguma seção mudou, e assets gerados antes que não são mais usados são
+# removidos (arquivos colocados à mão em assets/ não são tocados).
+# Devolve um dicionário com as imagens copiadas/removidas e as seções alteradas.
+def construir_painel(pasta_graficos='.', pasta_painel='../display/display'):
+    pasta_assets = os.path.join(pasta_painel, 'assets')
+    os.makedirs(pasta_assets, exist_ok=True)
+    caminho_manifesto = os.path.join(pasta_painel, MANIFESTO)
+    try:
+        with open(caminho_manifesto, encoding='utf-8') as arquivo:
+            manifesto = json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifesto = {'assets': {}, 'secoes': {}}
+
+    copiadas, alteradas = [], []
+    assets, secoes, partes = {}, {}, []
+    for identificador, titulo, classe, imagens in descobrir_secoes(pasta_graficos):
+        nomes = []
+        for imagem in imagens:
+            asset = nome_asset(imagem)
+            assets[asset] = _hash_arquivo(os.path.join(pasta_graficos, imagem))
+            destino = os.path.join(pasta_assets, asset)
+            if manifesto['assets'].get(asset) != assets[asset] or not os.path.exists(destino):
+                shutil.copyfile(os.path.join(pasta_graficos, imagem), destino)
+                copiadas.append(asset)
+            nomes.append(asset)
+        trecho = _html_secao(titulo, classe, nomes)
+        secoes[identificador] = hashlib.sha256((trecho + ''.join(assets[n] for n in nomes)).encode()).hexdigest()
+        if manifesto['secoes'].get(identificador) != secoes[identificador]:
+            alteradas.append(identificador)
+        partes.append(trecho)
+
+    removidas = sorted(set(manifesto['assets']) - set(assets))
+    for asset in removidas:
+        caminho = os.path.join(pasta_assets, asset)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+    indice = os.path.join(pasta_painel, 'index.html')
+    if alteradas or list(secoes) != list(manifesto['secoes']) or not os.path.exists(indice):
+        with open(indice, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(CABECALHO + ''.join(partes) + RODAPE)
+
+    with open(caminho_manifesto, 'w', encoding='utf-8') as arquivo:
+        json.dump({'assets': assets, 'secoes': secoes}, arquivo, indent=2)
+    return {'copiadas': copiadas, 'removidas': removidas, 'secoes_alteradas': alteradas}
+
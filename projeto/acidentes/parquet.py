@@ -0,0 +1,96 @@
+# Cópia da tabela de acidentes em Parquet particionado no formato Hive:
+#
+#     pasta/NU_ANO=2022/UF=43/ID_MUNICIP=431020/data_0.parquet
+#
+# Os arquivos podem ser lidos por qualquer leitor de Parquet que entenda
+# partições Hive (DuckDB, pyarrow.dataset, Spark, Polars). Pelo DuckDB
+# (conectar), os filtros de ano, município e UF das consultas de agregacao.py
+# descartam as pastas das outras partições sem abrir os arquivos, e só as
+# colunas usadas pela consulta são lidas dos que sobram. Linhas sem município
+# ficam na partição __HIVE_DEFAULT_PARTITION__.
+import glob
+import os
+import shutil
+
+import duckdb
+
+from acidentes.agregacao import TABELA
+from acidentes.categorias import texto_sql
+
+# Colunas das pastas, na ordem do caminho. UF é ID_MUNICIP // 10000 (os dois
+# primeiros dígitos do código IBGE)
+PARTICOES = ['NU_ANO', 'UF', 'ID_MUNICIP']
+
+# Tipos das colunas de partição ao ler de volta (os mesmos de carga_dbf); sem
+# isso o DuckDB as leria como BIGINT
+TIPOS_PARTICOES = {'NU_ANO': 'SMALLINT', 'UF': 'SMALLINT', 'ID_MUNICIP': 'INTEGER'}
+
+# Arquivos da exportação, na profundidade fixa das partições. Um glob
+# recursivo (**) percorreria a árvore inteira a cada consulta, o que com
+# milhares de municípios custa mais de um segundo
+ARQUIVOS = os.path.join(*(f'{coluna}=*' for coluna in PARTICOES), '*.parquet')
+
+
+# Troca destino por nova (se existir) com os.replace: quem lê a pasta nunca
+# vê um arquivo gravado pela metade, mas entre as duas trocas o destino fica
+# por um instante ausente (e conectar pode falhar ou não ver o ano)
+def _trocar(nova, destino):
+    antiga = destino + '.antiga'
+    shutil.rmtree(antiga, ignore_errors=True)
+    if os.path.exists(destino):
+        os.replace(destino, antiga)
+    if os.path.exists(nova):
+        os.replace(nova, destino)
+    shutil.rmtree(antiga, ignore_errors=True)
+
+
+# Exporta dadosacidentetrabalho para a pasta. Sem anos, a pasta é recriada
+# com a tabela inteira; com anos, só as partições desses anos são
+# substituídas e as dos outros ficam como estão. Os arquivos são gravados
+# antes numa pasta temporária ao lado (pasta.tmp) e só entram no lugar dos
+# antigos depois que o COPY termina: se a exportação falhar ou for
+# interrompida, a pasta continua com a versão anterior. Devolve as linhas gravadas.
+def exportar_parquet(conn, pasta, anos=None, compressao='zstd'):
+    pasta = os.path.normpath(pasta)
+    temporaria = pasta + '.tmp'
+    os.makedirs(pasta, exist_ok=True)
+    shutil.rmtree(temporaria, ignore_errors=True)
+    consulta = f'SELECT *, ID_MUNICIP // 10000 AS UF FROM {TABELA}'
+    if anos is not None:
+        anos = [int(ano) for ano in anos]
+        consulta += f" WHERE NU_ANO IN ({', '.join(str(ano) for ano in anos)})"
+    try:
+        linhas = conn.execute(f"""
+        COPY ({consulta}) TO {texto_sql(temporaria)}
+        (FORMAT parquet, PARTITION_BY ({', '.join(PARTICOES)}), OVERWRITE, COMPRESSION {compressao})
+        """).fetchone()[0]
+    except BaseException:
+        shutil.rmtree(temporaria, ignore_errors=True)
+        raise
+
+    if anos is None:
+        _trocar(temporaria, pasta)
+        os.makedirs(pasta, exist_ok=True)
+    else:
+        # anos sem linhas na tabela não têm pasta nova, e a antiga é removida
+        for ano in anos:
+            _trocar(os.path.join(temporaria, f'NU_ANO={ano}'), os.path.join(pasta, f'NU_ANO={ano}'))
+        shutil.rmtree(temporaria, ignore_errors=True)
+    return linhas
+
+
+# Conexão em memória em que dadosacidentetrabalho é uma view sobre os
+# arquivos da pasta, então agregacao, cubo e ocupacoes funcionam sem mudança.
+# O cubo e a tabela de ocupações, se usados, ficam só na memória.
+def conectar(pasta):
+    arquivos = os.path.join(pasta, ARQUIVOS)
+    if next(glob.iglob(arquivos), None) is None:
+        raise FileNotFoundError(f'Nenhum arquivo Parquet em {pasta}')
+    tipos = ', '.join(f'{texto_sql(coluna)}: {texto_sql(tipo)}' for coluna, tipo in TIPOS_PARTICOES.items())
+    conn = duckdb.connect()
+    conn.execute(f"""
+    CREATE VIEW {TABELA} AS
+    SELECT * FROM read_parquet({texto_sql(arquivos)},
+                               hive_partitioning = true, hive_types = {{{tipos}}}, union_by_name = true)
+    """)
+    return conn
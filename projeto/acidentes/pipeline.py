@@ -0,0 +1,232 @@
+# Uma só definição das contagens da análise (acidentes por município, por
+# faixa etária e por tipo de acidente), com o mesmo resultado qualquer que
+# seja a entrada e o backend que a lê:
+#
+#   pandas   CSVs ACGRBR lidos com o pandas (ingestao.carregar_csv), com
+#            idade.py e classificacao.py
+#   csv      os mesmos CSVs lidos pelo DuckDB numa conexão em memória
+#   banco    a tabela dadosacidentetrabalho de um banco DuckDB
+#   parquet  a exportação em Parquet (parquet.py)
+#
+# Os três backends do DuckDB passam pelas funções de agregacao.py; o do pandas
+# reproduz as mesmas tabelas, no mesmo formato. O ano de cada acidente é a
+# coluna NU_ANO em todos eles, e não o nome do arquivo. comparar_backends roda
+# a mesma contagem em vários backends e aponta as tabelas que diferem.
+import os
+import time
+
+from acidentes.instrumentacao import etapa
+
+BACKENDS = ['pandas', 'csv', 'banco', 'parquet']
+BACKENDS_CSV = {'pandas', 'csv'}
+
+# Tabelas do pipeline, no formato de agregacao: municipios (municípios x anos)
+# e faixas e tipos ((ano, município) x categorias)
+TABELAS = ['municipios', 'faixas', 'tipos']
+
+# Total de CSV (bytes) abaixo do qual o pandas é o backend mais rápido: em
+# arquivos pequenos pesa a abertura do DuckDB; a partir de uns 4 MB ele lê e
+# conta os CSVs em paralelo e fica cada vez mais rápido (3 vezes com 80 MB)
+LIMITE_PANDAS = 4 * 2**20
+
+# Colunas lidas pelo backend csv e seus tipos, os mesmos de carga_dbf e
+# ingestao.COLUNAS (só as usadas pelas três tabelas)
+TIPOS_CSV = {'NU_ANO': 'SMALLINT', 'ID_MUNICIP': 'INTEGER', 'NU_IDADE_N': 'SMALLINT', 'CID_ACID': 'VARCHAR'}
+
+
+# Entrada dos backends de CSV: um caminho, uma lista ou {ano: caminho}
+def _arquivos_csv(entrada):
+    if isinstance(entrada, str):
+        return [entrada]
+    if isinstance(entrada, dict):
+        return list(entrada.values())
+    return list(entrada)
+
+
+def _eh_csv(entrada):
+    return not isinstance(entrada, str) or entrada.lower().endswith('.csv')
+
+
+# Backend mais rápido para a entrada: uma pasta é a exportação em Parquet, um
+# arquivo que não é CSV é o banco, e CSVs vão para o pandas ou para o DuckDB
+# conforme o tamanho total
+def escolher_backend(entrada):
+    if not _eh_csv(entrada):
+        return 'parquet' if os.path.isdir(entrada) else 'banco'
+    tamanho = sum(os.path.getsize(caminho) for caminho in _arquivos_csv(entrada))
+    return 'pandas' if tamanho < LIMITE_PANDAS else 'csv'
+
+
+# Conexão em memória com os CSVs na tabela dadosacidentetrabalho. Os arquivos
+# são lidos uma vez só (e não a cada consulta, como numa view), com as
+# colunas que as contagens usam.
+def conectar_csv(arquivos):
+    import duckdb
+    from acidentes.agregacao import TABELA
+    from acidentes.categorias import texto_sql
+
+    lista = ', '.join(texto_sql(caminho) for caminho in arquivos)
+    tipos = ', '.join(f'{texto_sql(coluna)}: {texto_sql(tipo)}' for coluna, tipo in TIPOS_CSV.items())
+    conn = duckdb.connect()
+    conn.execute(f"""
+    CREATE TABLE {TABELA} AS
+    SELECT {', '.join(TIPOS_CSV)} FROM read_csv([{lista}], types = {{{tipos}}}, union_by_name = true)
+    """)
+    return conn
+
+
+def _conectar(backend, entrada):
+    if backend == 'csv':
+        return conectar_csv(_arquivos_csv(entrada))
+    if backend == 'parquet':
+        from acidentes.parquet import conectar
+        return conectar(entrada)
+    import duckdb
+    return duckdb.connect(entrada, read_only=True)
+
+
+def _contar_sql(conn, anos, municipios, uf):
+    from acidentes.agregacao import contar_por_faixa_etaria, contar_por_municipio, contar_por_tipo_acidente
+
+    return {
+        'municipios': contar_por_municipio(conn, anos, municipios, uf),
+        'faixas': contar_por_faixa_etaria(conn, anos, municipios, uf),
+        'tipos': contar_por_tipo_acidente(conn, anos, municipios, uf),
+    }
+
+
+# Contagens (séries com índice (ano, município[, categoria])) de um conjunto
+# de linhas: um arquivo inteiro ou um bloco. Os filtros e o descarte das
+# linhas sem município, faixa etária ou tipo são os de agregacao._sql_contagem.
+def _contar_linhas(dados, anos, municipios, uf):
+    from acidentes.classificacao import classificar_acidentes
+    from acidentes.idade import faixa_etaria_da_coluna
+
+    filtro = dados['NU_ANO'].isin(anos) & dados['ID_MUNICIP'].notna()
+    if municipios is not None:
+        filtro &= dados['ID_MUNICIP'].isin(municipios)
+    if uf is not None:
+        filtro &= dados['ID_MUNICIP'].between(uf * 10000, uf * 10000 + 9999).fillna(False)
+    dados = dados[filtro.to_numpy(dtype=bool)]
+    chaves = [dados['NU_ANO'], dados['ID_MUNICIP']]
+    with etapa('idade', len(dados)):
+        faixas = faixa_etaria_da_coluna(dados['NU_IDADE_N']).astype(object)
+    with etapa('classificacao', len(dados)):
+        tipos = classificar_acidentes(dados['CID_ACID']).rename('TIPO_ACIDENTE')
+    return {
+        'municipios': dados.groupby(chaves).size(),
+        'faixas': dados.groupby([*chaves, faixas]).size(),
+        'tipos': dados.groupby([*chaves, tipos]).size(),
+    }
+
+
+# Soma as contagens parciais de um bloco às acumuladas até aqui; o tamanho do
+# acumulado depende só da quantidade de grupos, não de linhas
+def _acumular(acumulado, parcial):
+    import pandas as pd
+
+    if acumulado is None:
+        return parcial
+    return {
+        chave: pd.concat([acumulado[chave], parcial[chave]]).groupby(level=list(range(parcial[chave].index.nlevels))).sum()
+        for chave in parcial
+    }
+
+
+# Contagens acumuladas -> tabelas no formato de agregacao, ordenadas como o
+# ORDER BY das consultas
+def _montar_tabelas(contagens):
+    tabelas = {
+        'municipios': contagens['municipios'].unstack('NU_ANO', fill_value=0),
+        'faixas': contagens['faixas'].unstack('FAIXA_ETARIA', fill_value=0),
+        'tipos': contagens['tipos'].unstack('TIPO_ACIDENTE', fill_value=0),
+    }
+    for tabela in tabelas.values():
+        tabela.attrs['aproximado'] = False
+    return {nome: tabela.sort_index().sort_index(axis=1) for nome, tabela in tabelas.items()}
+
+
+# tamanho_bloco: se informado, cada arquivo é lido em blocos de tamanho_bloco
+# linhas (ingestao.ler_csv_em_blocos), com memória constante; senão, inteiro
+# e uma única vez (ingestao.carregar_csv)
+def _contar_pandas(arquivos, anos, municipios, uf, tamanho_bloco=None):
+    from acidentes.ingestao import carregar_csv, ler_csv_em_blocos
+
+    acumulado = None
+    for caminho in arquivos:
+        if tamanho_bloco:
+            with etapa(f'blocos:{os.path.basename(caminho)}') as medida, ler_csv_em_blocos(caminho, tamanho_bloco) as blocos:
+                medida['entrada'] = 0
+                for bloco in blocos:
+                    medida['entrada'] += len(bloco)
+                    acumulado = _acumular(acumulado, _contar_linhas(bloco, anos, municipios, uf))
+        else:
+            with etapa('carga') as medida:
+                dados = carregar_csv(caminho)
+                medida['saida'] = len(dados)
+            with etapa('contagem', len(dados)):
+                acumulado = _acumular(acumulado, _contar_linhas(dados, anos, municipios, uf))
+    return _montar_tabelas(acumulado)
+
+
+# Roda o pipeline sobre a entrada (CSVs, caminho do banco ou pasta Parquet)
+# e devolve {nome: tabela} com as tabelas de TABELAS. Sem backend, usa o de
+# escolher_backend; tamanho_bloco vale só para o pandas e, sem backend, o escolhe.
+def executar(entrada, anos, municipios=None, uf=None, backend=None, tamanho_bloco=None):
+    backend = backend or ('pandas' if tamanho_bloco else escolher_backend(entrada))
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {backend!r} (use {', '.join(map(repr, BACKENDS))})")
+    if (backend in BACKENDS_CSV) != _eh_csv(entrada):
+        raise ValueError(f'O backend {backend!r} não lê {entrada!r}')
+    anos = list(anos)
+    municipios = None if municipios is None else list(municipios)
+
+    with etapa(f'pipeline:{backend}') as medida:
+        if backend == 'pandas':
+            tabelas = _contar_pandas(_arquivos_csv(entrada), anos, municipios, uf, tamanho_bloco)
+        else:
+            conn = _conectar(backend, entrada)
+            try:
+                tabelas = _contar_sql(conn, anos, municipios, uf)
+            finally:
+                conn.close()
+        medida['saida'] = int(tabelas['municipios'].to_numpy().sum())
+    return tabelas
+
+
+# Primeira diferença entre duas tabelas, ou None se forem idênticas (mesmos
+# rótulos e contagens; o tipo inteiro de cada backend pode variar)
+def _diferenca(esperada, obtida):
+    import pandas as pd
+
+    try:
+        pd.testing.assert_frame_equal(esperada, obtida, check_dtype=False, check_index_type=False,
+                                      check_column_type=False, check_categorical=False)
+    except AssertionError as e:
+        return ' '.join(str(e).split())
+    return None
+
+
+# Roda o pipeline em cada backend de entradas ({backend: entrada}, ex.:
+# {'pandas': csvs, 'csv': csvs, 'banco': 'database/database_cd.db'}) e compara
+# as tabelas de cada um com as do primeiro. Devolve {backend: {'segundos':
+# tempo, 'diferencas': {tabela: descrição}}}, com diferencas vazio quando o
+# backend produziu tabelas idênticas.
+def comparar_backends(entradas, anos, municipios=None, uf=None):
+    from acidentes.agregacao import amostra_ativa
+
+    if amostra_ativa():
+        raise ValueError('A comparação entre backends usa as contagens exatas; desative o modo aproximado')
+    resultado = {}
+    referencia = None
+    for backend, entrada in entradas.items():
+        inicio = time.perf_counter()
+        tabelas = executar(entrada, anos, municipios, uf, backend)
+        segundos = time.perf_counter() - inicio
+        referencia = referencia or tabelas
+        diferencas = {nome: _diferenca(referencia[nome], tabelas[nome]) for nome in TABELAS}
+        resultado[backend] = {
+            'segundos': segundos,
+            'diferencas': {nome: diferenca for nome, diferenca in diferencas.items() if diferenca},
+        }
+    return resultado
@@ -0,0 +1,54 @@
+# Tabela de referência dos municípios: população, área e PIB por código IBGE,
+# montada a partir das tabelas do IBGE (estimativas de população, área
+# territorial e PIB dos municípios). O CSV tem as colunas ID_MUNICIP (código
+# com 6 ou 7 dígitos; o 7º, verificador, é descartado como no DATASUS),
+# POPULACAO, AREA_KM2, PIB (R$) e, opcionalmente, DENSIDADE (hab/km²), que
+# quando vazia é calculada como POPULACAO / AREA_KM2. Outras colunas são
+# ignoradas e valores vazios ficam NaN.
+import pandas as pd
+
+REFERENCIA = 'referencia_municipios'
+COLUNAS = ['POPULACAO', 'AREA_KM2', 'DENSIDADE', 'PIB']
+
+
+# Município (código de 6 dígitos) nas linhas e COLUNAS nas colunas, em float
+def ler_referencia(caminho):
+    dados = pd.read_csv(caminho)
+    codigos = dados['ID_MUNICIP'].astype('int64')
+    dados['ID_MUNICIP'] = codigos.where(codigos < 1_000_000, codigos // 10)
+    referencia = dados.set_index('ID_MUNICIP').reindex(columns=COLUNAS).astype('float64')
+    referencia['DENSIDADE'] = referencia['DENSIDADE'].fillna(referencia['POPULACAO'] / referencia['AREA_KM2'])
+    return referencia
+
+
+# Grava a referência na conexão como tabela temporária: funciona também com o
+# banco aberto só para leitura e o arquivo é relido a cada execução (é pequeno).
+# Devolve a quantidade de municípios.
+def carregar_referencia(conn, caminho):
+    referencia = ler_referencia(caminho)
+    conn.register('referencia_csv', referencia.reset_index())
+    try:
+        conn.execute(f'CREATE OR REPLACE TEMP TABLE {REFERENCIA} AS SELECT * FROM referencia_csv')
+    finally:
+        conn.unregister('referencia_csv')
+    return len(referencia)
+
+
+def referencia_carregada(conn):
+    return conn.execute(f'SELECT * FROM {REFERENCIA}').df().set_index('ID_MUNICIP')
+
+
+# Junta as contagens (municípios por código nas linhas, anos nas colunas) com
+# a referência e calcula, para todos os municípios de uma vez, acidentes por
+# 100 mil habitantes e por R$ 1 milhão de PIB em cada ano. Colunas
+# acidentes_{ano}, COLUNAS, por_100mil_hab_{ano} e por_milhao_pib_{ano}; só
+# os municípios presentes na referência.
+def taxas(acidentes, referencia):
+    dados = acidentes.join(referencia, how='inner')
+    contagens = dados[acidentes.columns]
+    return pd.concat([
+        contagens.rename(columns=lambda ano: f'acidentes_{ano}'),
+        dados[COLUNAS],
+        contagens.div(dados['POPULACAO'], axis=0).mul(100_000).rename(columns=lambda ano: f'por_100mil_hab_{ano}'),
+        contagens.div(dados['PIB'], axis=0).mul(1_000_000).rename(columns=lambda ano: f'por_milhao_pib_{ano}'),
+    ], axis=1)
@@ -0,0 +1,233 @@
+# Relatórios das análises: cada um monta a lista de gráficos (renderizacao.grafico)
+# a partir das tabelas agregadas. As funções graficos_* recebem as tabelas já
+# contadas, venham do banco ou dos CSVs; as relatorio_* consultam o banco.
+import numpy as np
+import pandas as pd
+
+from acidentes.agregacao import (
+    contar_por_faixa_etaria,
+    contar_por_municipio,
+    contar_por_tipo_acidente,
+    top_cargos,
+    top_cargos_por_faixa_etaria,
+    top_cargos_por_municipio,
+)
+from acidentes.categorias import atividades_economicas, faixas_etarias, nome_municipio
+from acidentes.estatistica import intervalo_poisson
+from acidentes.referencia import referencia_carregada, taxas
+from acidentes.renderizacao import grafico
+
+
+def _anos(anos, separador=' vs '):
+    return separador.join(str(ano) for ano in anos)
+
+
+# Barras de erro com o intervalo de Poisson de cada contagem, no formato do
+# yerr do pandas (colunas x [abaixo, acima] x linhas); em listas para entrar
+# no hash do gráfico
+def _erros(dados, confianca):
+    valores = dados.to_numpy(dtype='float64')
+    inferior, superior = intervalo_poisson(valores, confianca)
+    return np.stack([valores - inferior, superior - valores]).transpose(2, 0, 1).round(6).tolist()
+
+
+# Quantidade de acidentes: municípios (nomes) nas linhas e anos nas colunas.
+# Com confianca (ex.: 0.95), as contagens ganham barras de erro.
+def graficos_municipios(acidentes, confianca=None):
+    comparacao = acidentes.rename(columns=str)
+    estilo = {'erros': _erros(comparacao, confianca)} if confianca else {}
+    return [
+        grafico('qtd_ac.png', 'barras_comparacao_anos', comparacao,
+                titulo=f'Comparação de Acidentes de Trabalho ({_anos(acidentes.columns)})', **estilo),
+        grafico('comp_qtd_acid.png', 'linhas_comparacao_cidades', comparacao,
+                titulo=f'Comparação de Acidentes de Trabalho nas Cidades ({_anos(acidentes.columns)})', **estilo),
+    ]
+
+
+# Faixas etárias: linhas (ano, cidade) e faixas nas colunas. Com confianca,
+# as contagens ganham barras de erro.
+def graficos_faixas(faixas, confianca=None):
+    anos = list(dict.fromkeys(faixas.index.get_level_values(0)))
+    cidades = list(dict.fromkeys(faixas.index.get_level_values(1)))
+    rotulos = [rotulo for rotulo, _ in faixas_etarias if rotulo in faixas.columns]
+    faixas = faixas[rotulos].rename(columns=str)
+
+    dados_comparados = pd.concat({
+        cidade: faixas.xs(cidade, level=1).T.reindex(columns=anos, fill_value=0).rename(columns=str)
+        for cidade in cidades
+    })
+    estilo = {'erros': {cidade: _erros(dados_comparados.loc[cidade], confianca) for cidade in cidades}} if confianca else {}
+    return [grafico('faixa_etaria.png', 'barras_faixas_etarias', dados_comparados,
+                    titulo=f'Faixas Etárias Afetadas por Acidentes de Trabalho ({_anos(anos)})', **estilo)]
+
+
+# Tipos de acidente: linhas (ano, cidade) e tipos nas colunas. Uma pizza por
+# cidade e ano, mais a comparação dos três tipos mais comuns de cada cidade
+def graficos_tipos(tipos):
+    graficos = []
+    for ano, cidade in tipos.index:
+        dados_cidade_ano = tipos.loc[(ano, cidade)]
+        dados_cidade_ano = dados_cidade_ano[dados_cidade_ano > 0]
+        graficos.append(grafico(
+            f'graficos_acidentes_{cidade}_{ano}.png',
+            'pizza_tipos_acidente',
+            dados_cidade_ano,
+            titulo=f'Tipos de Acidentes em {cidade} ({ano})'
+        ))
+
+    anos = list(dict.fromkeys(tipos.index.get_level_values(0)))
+    top_acidentes = pd.concat({
+        ano: tipos.loc[ano].apply(lambda x: x.nlargest(3), axis=1) for ano in anos
+    })
+    graficos.append(grafico(
+        'tipos_acid_comuns.png',
+        'barras_top_tipos',
+        top_acidentes,
+        titulo=f'Tipos de Acidentes Mais Comuns por Cidade ({_anos(anos, " e ")})',
+        atividades=atividades_economicas
+    ))
+    return graficos
+
+
+# Acidentes comparados com densidade demográfica e PIB, a partir de
+# referencia.taxas (municípios por código nas linhas), para os n municípios
+# com mais acidentes no último ano entre os que têm densidade e PIB na
+# referência. Com a população, também os n municípios com mais acidentes por
+# 100 mil habitantes no último ano.
+def graficos_pib(taxas_municipios, n=20):
+    anos = [coluna.removeprefix('acidentes_') for coluna in taxas_municipios.columns if coluna.startswith('acidentes_')]
+    comparacao = taxas_municipios.dropna(subset=['DENSIDADE', 'PIB'])
+    comparacao = (
+        comparacao[comparacao.index.isin(comparacao[f'acidentes_{anos[-1]}'].nlargest(n).index)]
+        [[f'acidentes_{ano}' for ano in anos] + ['DENSIDADE', 'PIB']]
+        .rename(columns={'DENSIDADE': 'densidade', 'PIB': 'pib'}, index=nome_municipio).rename_axis(None).astype('float64')
+    )
+    graficos = [grafico(
+        'comp_den_acid_pib.png',
+        'barras_densidade_pib',
+        comparacao,
+        titulo=f'Comparação de Acidentes de Trabalho, Densidade Populacional e PIB ({_anos(anos)})',
+        anos=anos
+    )]
+
+    por_habitante = taxas_municipios[[f'por_100mil_hab_{ano}' for ano in anos]].dropna()
+    if not por_habitante.empty:
+        maiores = por_habitante.sort_values(f'por_100mil_hab_{anos[-1]}', ascending=False).head(n)
+        graficos.append(grafico(
+            'taxas_acidentes.png',
+            'barras_taxas',
+            maiores.set_axis(anos, axis=1).rename(index=nome_municipio),
+            titulo=f'Acidentes de Trabalho por 100 mil Habitantes ({_anos(anos)})'
+        ))
+    return graficos
+
+
+# Cargos mais afetados no total: formato longo (NU_ANO, CARGO, QTD)
+def graficos_cargos(top):
+    cargos_por_ano = pd.DataFrame({
+        str(ano): grupo.set_index('CARGO')['QTD'] for ano, grupo in top.groupby('NU_ANO')
+    })
+    return [
+        grafico('cargos_mais_afetados.png', 'barras_top_cargos_anos', cargos_por_ano,
+                titulo='Cargos com Mais Acidentes de Trabalho'),
+        grafico('comparacao_cargos.png', 'barras_comparacao_cargos', cargos_por_ano.fillna(0).head(10),
+                titulo=f'Comparação de Acidentes por Cargo ({_anos(cargos_por_ano.columns)})'),
+    ]
+
+
+# Cargos mais afetados em cada município: o top de cada município e ano, em
+# formato longo (NU_ANO, ID_MUNICIP, CARGO, QTD), de agregacao.top_cargos_por_municipio.
+# A tabela (município, cargo) x ano é montada uma vez só e depois dividida por município.
+def graficos_cargos_municipios(top):
+    anos = sorted(top['NU_ANO'].unique())
+    tabela = (
+        top.set_index(['ID_MUNICIP', 'CARGO', 'NU_ANO'])['QTD'].unstack(fill_value=0)
+        .reindex(columns=anos, fill_value=0).rename(columns=str).rename_axis(columns=None)
+    )
+    graficos = []
+    for id_municipio, df_plot in tabela.groupby(level='ID_MUNICIP'):
+        graficos.append(grafico(
+            f'cargos_afetados_{id_municipio}.png',
+            'barras_cargos',
+            df_plot.droplevel('ID_MUNICIP'),
+            titulo=f'Cargos Mais Afetados em {nome_municipio(id_municipio)} ({_anos(anos)})'
+        ))
+    return graficos
+
+
+# Faixas etárias dos cargos mais afetados em cada município: formato longo
+# (NU_ANO, ID_MUNICIP, CARGO, FAIXA_ETARIA, QTD), na ordem do ranking, de
+# agregacao.top_cargos_por_faixa_etaria. Como acima, uma única tabela
+# (município, cargo) x (ano, faixa), com os cargos na ordem do ranking.
+def graficos_cargos_faixas(top, n=5):
+    ranking = pd.MultiIndex.from_frame(top[['ID_MUNICIP', 'CARGO']].drop_duplicates())
+    tabela = (
+        top.set_index(['ID_MUNICIP', 'CARGO', 'NU_ANO', 'FAIXA_ETARIA'])['QTD']
+        .unstack(['NU_ANO', 'FAIXA_ETARIA']).sort_index(axis=1).reindex(ranking)
+    )
+    graficos = []
+    for id_municipio, data in tabela.groupby(level='ID_MUNICIP'):
+        # só as combinações de ano e faixa que aparecem nos cargos do município
+        data = data.droplevel('ID_MUNICIP').dropna(axis=1, how='all').fillna(0).astype('int64')
+
+        graficos.append(grafico(
+            f'faixa_etaria_cargo_{id_municipio}.png',
+            'barras_faixas_por_cargo',
+            data,
+            titulo=f'Top {n} Faixas Etárias por Cargo - {nome_municipio(id_municipio)}'
+        ))
+    return graficos
+
+
+def _acidentes_por_municipio(conn, anos, municipios, uf, fonte):
+    return contar_por_municipio(conn, anos, municipios, uf, fonte).rename(index=nome_municipio)
+
+
+def relatorio_municipios(conn, anos, municipios=None, uf=None, fonte='bruto', confianca=None):
+    return graficos_municipios(_acidentes_por_municipio(conn, anos, municipios, uf, fonte), confianca)
+
+
+def relatorio_faixas(conn, anos, municipios=None, uf=None, fonte='bruto', confianca=None):
+    faixas = contar_por_faixa_etaria(conn, anos, municipios, uf, fonte)
+    return graficos_faixas(faixas.rename(index=nome_municipio, level='ID_MUNICIP'), confianca)
+
+
+def relatorio_tipos(conn, anos, municipios=None, uf=None, fonte='bruto'):
+    tipos = contar_por_tipo_acidente(conn, anos, municipios, uf, fonte)
+    return graficos_tipos(tipos.rename(index=nome_municipio, level='ID_MUNICIP'))
+
+
+# Usa a referência carregada na conexão (referencia.carregar_referencia)
+def relatorio_pib(conn, anos, municipios=None, uf=None, fonte='bruto'):
+    acidentes = contar_por_municipio(conn, anos, municipios, uf, fonte)
+    return graficos_pib(taxas(acidentes, referencia_carregada(conn)))
+
+
+def relatorio_cargos(conn, anos, municipios=None, uf=None, fonte='bruto'):
+    return graficos_cargos(top_cargos(conn, anos, municipios, uf, n=10, fonte=fonte))
+
+
+def relatorio_cargos_municipios(conn, anos, municipios=None, uf=None, fonte='bruto'):
+    return graficos_cargos_municipios(top_cargos_por_municipio(conn, anos, municipios, uf, n=5, fonte=fonte))
+
+
+def relatorio_cargos_faixas(conn, anos, municipios=None, uf=None, fonte='bruto'):
+    return graficos_cargos_faixas(top_cargos_por_faixa_etaria(conn, anos, municipios, uf, n=5, fonte=fonte), n=5)
+
+
+# Nome do subcomando -> função do relatório. Os relatórios de cargos precisam
+# da tabela de ocupações no banco (ocupacoes.carregar_ocupacoes) e o de PIB,
+# da referência dos municípios (referencia.carregar_referencia).
+RELATORIOS = {
+    'municipios': relatorio_municipios,
+    'faixas': relatorio_faixas,
+    'tipos': relatorio_tipos,
+    'pib': relatorio_pib,
+    'cargos': relatorio_cargos,
+    'cargos-municipios': relatorio_cargos_municipios,
+    'cargos-faixas': relatorio_cargos_faixas,
+}
+RELATORIOS_CARGOS = {'cargos', 'cargos-municipios', 'cargos-faixas'}
+RELATORIOS_REFERENCIA = {'pib'}
+# Relatórios que desenham barras de erro com o parâmetro confianca
+RELATORIOS_INTERVALOS = {'municipios', 'faixas'}
@@ -0,0 +1,107 @@
+import hashlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+# Arquivo, dentro da pasta de saída, com o hash de cada gráfico já gerado
+MANIFESTO = '.graficos_hash.json'
+
+
+# Descreve um gráfico a ser gerado: o arquivo de saída, o nome da função de
+# desenho em graficos.DESENHOS, os dados agregados e os parâmetros de estilo
+def grafico(saida, desenho, dados, **estilo):
+    return {'saida': saida, 'desenho': desenho, 'dados': dados, 'estilo': estilo}
+
+
+# Código do módulo de desenho, lido do arquivo para não importar o matplotlib
+# só para calcular o hash
+@lru_cache(maxsize=None)
+def _codigo_desenhos():
+    with open(importlib.util.find_spec('acidentes.graficos').origin, 'rb') as arquivo:
+        return arquivo.read()
+
+
+# O hash cobre os dados, os parâmetros de estilo e o código de desenho, então
+# mudar qualquer um deles faz o gráfico ser gerado de novo
+def _hash(item):
+    conteudo = hashlib.sha256()
+    conteudo.update(_codigo_desenhos())
+    conteudo.update(item['desenho'].encode())
+    conteudo.update(item['dados'].to_json(orient='split').encode())
+    conteudo.update(json.dumps(item['estilo'], sort_keys=True, default=str).encode())
+    return conteudo.hexdigest()
+
+
+def _ler_manifesto(pasta):
+    try:
+        with open(os.path.join(pasta, MANIFESTO), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _gravar_manifesto(pasta, manifesto):
+    with open(os.path.join(pasta, MANIFESTO), 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, indent=2, sort_keys=True)
+
+
+# Nos processos do pool o backend é sempre o não interativo; no processo
+# principal o backend atual é mantido se o pyplot já estiver em uso (a figura é
+# salva e fechada sem ser exibida)
+def _desenhar(item, pasta, sem_tela=True):
+    if sem_tela:
+        import matplotlib
+        matplotlib.use('Agg', force=True)
+    import matplotlib.pyplot as plt
+    from acidentes.graficos import DESENHOS
+
+    DESENHOS[item['desenho']](item['dados'], **item['estilo'])
+    plt.savefig(os.path.join(pasta, item['saida']))
+    plt.close('all')
+    return item['saida']
+
+
+# Os processos criados por 'fork' herdam o tracemalloc e o cProfile da medição
+# por etapa (instrumentacao.py), que deixariam o desenho várias vezes mais lento
+def _iniciar_processo():
+    import tracemalloc
+
+    tracemalloc.stop()
+    sys.setprofile(None)
+
+
+# Gera os gráficos em paralelo, sem abrir janelas. Gráficos cujo arquivo já
+# existe com o mesmo hash de dados e estilo são pulados.
+# Devolve (gerados, pulados) com os nomes dos arquivos.
+def renderizar(graficos, pasta='.', processos=None):
+    os.makedirs(pasta, exist_ok=True)
+    manifesto = _ler_manifesto(pasta)
+
+    pendentes, pulados = [], []
+    for item in graficos:
+        item['hash'] = _hash(item)
+        existe = os.path.exists(os.path.join(pasta, item['saida']))
+        if existe and manifesto.get(item['saida']) == item['hash']:
+            pulados.append(item['saida'])
+        else:
+            pendentes.append(item)
+
+    if len(pendentes) <= 1 or processos == 1:
+        sem_tela = 'matplotlib.pyplot' not in sys.modules
+        gerados = [_desenhar(item, pasta, sem_tela) for item in pendentes]
+    else:
+        # com 'spawn' cada processo importaria de novo o script que chamou,
+        # então 'fork' é preferido onde existe
+        metodo = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context(metodo),
+                                 initializer=_iniciar_processo) as pool:
+            gerados = list(pool.map(_desenhar, pendentes, [pasta] * len(pendentes)))
+
+    for item in pendentes:
+        manifesto[item['saida']] = item['hash']
+    _gravar_manifesto(pasta, manifesto)
+    return gerados, pulados
@@ -0,0 +1,167 @@
+# Séries temporais dos acidentes: contagens por mês e por semana ISO, por
+# município e tipo de acidente, a partir de uma coluna de data da tabela bruta
+# (a da notificação, DT_NOTIFIC, ou outra, como a data do acidente). As
+# contagens ficam na tabela SERIES e, como no cubo (cubo.py), são atualizadas
+# por partes: a quantidade de linhas de cada mês e a sua assinatura (a soma do
+# hash das colunas usadas) são registradas em PARTICOES, e só os meses novos ou
+# alterados, e as semanas que os tocam, são recalculados quando chegam
+# notificações novas (inclusive as atrasadas, de meses antigos) ou correções.
+from datetime import timedelta
+
+from acidentes.agregacao import DIMENSOES, TABELA, consultar, marcadores
+
+SERIES = 'serie_acidentes'
+PARTICOES = 'serie_particoes'
+DATA = 'DT_NOTIFIC'
+
+# Granularidade -> (unidade do date_trunc, ano do período, número do período
+# no ano). A semana é a ISO (começa na segunda e pertence ao ano ISO).
+GRANULARIDADES = {
+    'mes': ('month', 'year', 'month'),
+    'semana': ('week', 'isoyear', 'week'),
+}
+
+
+def _criar_tabelas(conn):
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {SERIES} (DATA VARCHAR, GRANULARIDADE VARCHAR, INICIO DATE, '
+                 'ID_MUNICIP INTEGER, TIPO_ACIDENTE VARCHAR, QTD BIGINT)')
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {PARTICOES} (DATA VARCHAR, MES DATE, LINHAS BIGINT, ASSINATURA HUGEINT, '
+                 'PRIMARY KEY (DATA, MES))')
+    # bancos criados antes da assinatura: os meses sem ela são recalculados uma vez
+    conn.execute(f'ALTER TABLE {PARTICOES} ADD COLUMN IF NOT EXISTS ASSINATURA HUGEINT')
+
+
+# O nome da coluna entra no SQL, então só colunas de data da tabela bruta
+def _coluna_data(conn, data):
+    tipos = dict(conn.execute(f'SELECT column_name, column_type FROM (DESCRIBE {TABELA})').fetchall())
+    if not tipos.get(data, '').startswith(('DATE', 'TIMESTAMP')):
+        datas = [coluna for coluna, tipo in tipos.items() if tipo.startswith(('DATE', 'TIMESTAMP'))]
+        raise ValueError(f"Coluna de data inválida: {data!r} (colunas de data em {TABELA}: {', '.join(datas) or 'nenhuma'})")
+    return f'CAST({data} AS DATE)'
+
+
+# Início de cada semana ISO que tem algum dia no mês
+def _semanas_do_mes(mes):
+    fim = (mes.replace(day=28) + timedelta(days=4)).replace(day=1)
+    semana = mes - timedelta(days=mes.weekday())
+    while semana < fim:
+        yield semana
+        semana += timedelta(days=7)
+
+
+def _select_series(coluna, granularidade, inicios):
+    unidade = GRANULARIDADES[granularidade][0]
+    inicio = f"CAST(date_trunc('{unidade}', {coluna}) AS DATE)"
+    return (f"SELECT ? AS DATA, '{granularidade}' AS GRANULARIDADE, {inicio} AS INICIO, ID_MUNICIP, "
+            f"{DIMENSOES['TIPO_ACIDENTE']} AS TIPO_ACIDENTE, COUNT(*) AS QTD FROM {TABELA} "
+            f"WHERE ID_MUNICIP IS NOT NULL AND {inicio} IN ({marcadores(inicios)}) GROUP BY ALL")
+
+
+# Cria ou atualiza as séries da coluna `data`. Só os meses novos ou com
+# quantidade de linhas ou assinatura diferentes da última atualização são
+# recalculados (com forcar, todos), junto com as semanas que têm dias neles;
+# meses que sumiram da tabela bruta são removidos. Devolve os meses
+# recalculados ou removidos.
+def atualizar_series(conn, data=DATA, forcar=False):
+    coluna = _coluna_data(conn, data)
+    _criar_tabelas(conn)
+    atuais = {mes: (linhas, assinatura) for mes, linhas, assinatura in conn.execute(
+        f"SELECT CAST(date_trunc('month', {coluna}) AS DATE), COUNT(*), SUM(hash({coluna}, ID_MUNICIP, CID_ACID)) "
+        f'FROM {TABELA} WHERE {coluna} IS NOT NULL AND ID_MUNICIP IS NOT NULL GROUP BY 1'
+    ).fetchall()}
+    registrados = {mes: (linhas, assinatura) for mes, linhas, assinatura in conn.execute(
+        f'SELECT MES, LINHAS, ASSINATURA FROM {PARTICOES} WHERE DATA = ?', [data]
+    ).fetchall()}
+
+    meses = sorted({mes for mes, marca in atuais.items() if forcar or registrados.get(mes) != marca}
+                   | (set(registrados) - set(atuais)))
+    if not meses:
+        return []
+    semanas = sorted({semana for mes in meses for semana in _semanas_do_mes(mes)})
+
+    conn.begin()
+    try:
+        conn.execute(f"DELETE FROM {SERIES} WHERE DATA = ? AND ((GRANULARIDADE = 'mes' AND INICIO IN ({marcadores(meses)})) "
+                     f"OR (GRANULARIDADE = 'semana' AND INICIO IN ({marcadores(semanas)})))", [data, *meses, *semanas])
+        conn.execute(f'DELETE FROM {PARTICOES} WHERE DATA = ? AND MES IN ({marcadores(meses)})', [data, *meses])
+        conn.execute(f"INSERT INTO {SERIES} {_select_series(coluna, 'mes', meses)}", [data, *meses])
+        conn.execute(f"INSERT INTO {SERIES} {_select_series(coluna, 'semana', semanas)}", [data, *semanas])
+        linhas = [[data, mes, *atuais[mes]] for mes in meses if mes in atuais]
+        if linhas:
+            conn.executemany(f'INSERT INTO {PARTICOES} VALUES (?, ?, ?, ?)', linhas)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return meses
+
+
+# Série de um município (ou de cada tipo de acidente no município, com
+# por_tipo) em cada mês ou semana ISO, com os períodos sem acidentes em zero.
+# Colunas ANO e PERIODO (mês ou semana no ano), INICIO, ID_MUNICIP,
+# [TIPO_ACIDENTE], QTD, MEDIA_MOVEL (média dos últimos `janela` períodos,
+# vazia enquanto não há períodos suficientes), QTD_ANO_ANTERIOR (mesmo
+# período do ano anterior) e VARIACAO_ANUAL (QTD - QTD_ANO_ANTERIOR). Com
+# anos, só esses anos saem, mas a média móvel e a variação usam o ano
+# anterior. Lê a tabela de atualizar_series, que deve ter sido chamada antes.
+def serie(conn, granularidade='mes', anos=None, municipios=None, uf=None, por_tipo=False, janela=3, data=DATA):
+    if granularidade not in GRANULARIDADES:
+        raise ValueError(f"Granularidade desconhecida: {granularidade!r} (use {' ou '.join(map(repr, GRANULARIDADES))})")
+    if janela < 1:
+        raise ValueError(f'Janela inválida: {janela} (use 1 ou mais períodos)')
+    unidade, ano, periodo = GRANULARIDADES[granularidade]
+    grupos = ['ID_MUNICIP', 'TIPO_ACIDENTE'] if por_tipo else ['ID_MUNICIP']
+    chaves = ', '.join(grupos)
+
+    # o calendário vai do primeiro ao último período com acidentes em qualquer
+    # município, para que todas as séries tenham os mesmos períodos
+    periodos = ['DATA = ?', 'GRANULARIDADE = ?']
+    parametros_periodos = [data, granularidade]
+    if anos is not None:
+        anos = list(anos)
+        periodos.append(f'{ano}(INICIO) BETWEEN ? AND ?')
+        parametros_periodos += [min(anos) - 1, max(anos)]
+    condicoes = list(periodos)
+    parametros = list(parametros_periodos)
+    if por_tipo:
+        condicoes.append('TIPO_ACIDENTE IS NOT NULL')
+    if municipios is not None:
+        municipios = list(municipios)
+        condicoes.append(f'ID_MUNICIP IN ({marcadores(municipios)})')
+        parametros += municipios
+    if uf is not None:
+        condicoes.append('ID_MUNICIP BETWEEN ? AND ?')
+        parametros += [uf * 10000, uf * 10000 + 9999]
+
+    query = f'''
+        WITH contagem AS (
+            SELECT INICIO, {chaves}, CAST(SUM(QTD) AS BIGINT) AS QTD
+            FROM {SERIES} WHERE {' AND '.join(condicoes)} GROUP BY ALL
+        ),
+        limites AS (
+            SELECT MIN(INICIO) AS PRIMEIRO, MAX(INICIO) AS ULTIMO FROM {SERIES} WHERE {' AND '.join(periodos)}
+        ),
+        periodos AS (
+            SELECT CAST(range AS DATE) AS INICIO
+            FROM limites, range(PRIMEIRO, ULTIMO + INTERVAL 1 {unidade}, INTERVAL 1 {unidade})
+        ),
+        completa AS (
+            SELECT {ano}(INICIO) AS ANO, {periodo}(INICIO) AS PERIODO, INICIO, {chaves}, COALESCE(contagem.QTD, 0) AS QTD
+            FROM periodos CROSS JOIN (SELECT DISTINCT {chaves} FROM contagem) AS grupos
+            LEFT JOIN contagem USING (INICIO, {chaves})
+        ),
+        janelas AS (
+            SELECT *,
+                CASE WHEN COUNT(*) OVER movel = {int(janela)} THEN AVG(QTD) OVER movel END AS MEDIA_MOVEL
+            FROM completa
+            WINDOW movel AS (PARTITION BY {chaves} ORDER BY INICIO ROWS BETWEEN {int(janela) - 1} PRECEDING AND CURRENT ROW)
+        )
+        SELECT atual.*, anterior.QTD AS QTD_ANO_ANTERIOR, atual.QTD - anterior.QTD AS VARIACAO_ANUAL
+        FROM janelas AS atual
+        LEFT JOIN completa AS anterior
+            ON anterior.ANO = atual.ANO - 1 AND anterior.PERIODO = atual.PERIODO
+            AND {' AND '.join(f'anterior.{g} = atual.{g}' for g in grupos)}
+        {f'WHERE atual.ANO IN ({marcadores(anos)})' if anos is not None else ''}
+        ORDER BY {', '.join(f'atual.{g}' for g in grupos)}, atual.INICIO
+    '''
+    return consultar(conn, query, parametros + parametros_periodos + (anos or []))
@@ -0,0 +1,276 @@
+# Servidor HTTP local, só com asyncio (sem dependências além das do projeto),
+# que entrega as contagens de agregacao.py em JSON e o painel interativo
+# (display/display/interativo.html), que desenha os gráficos no navegador.
+#
+#     GET /api/anos
+#     GET /api/municipios?anos=2022,2023&uf=43
+#     GET /api/contagens?dimensoes=ID_MUNICIP,FAIXA_ETARIA&anos=2022,2023&municipios=431020,431390&uf=43&fonte=bruto
+#     GET /api/top-cargos?por=ID_MUNICIP&n=5&anos=2022&uf=43
+#
+# Todas as consultas usam uma única conexão só de leitura, com um cursor por
+# consulta (cada uma roda numa thread, sem travar o laço de eventos). A tabela
+# de ocupações, lida do OCUPANET.csv, não é gravada no banco: como a
+# referência dos municípios (referencia.carregar_referencia), ela fica só na
+# memória, registrada em cada cursor. Fonte desconhecida responde 400, e o
+# cubo ou as ocupações ausentes, 404. As
+# respostas ficam num cache em memória (as LIMITE_CACHE mais recentes) e
+# pedidos iguais feitos ao mesmo tempo esperam a mesma consulta. Cada resposta
+# tem um ETag: o navegador revalida com If-None-Match e recebe 304 sem corpo
+# quando nada mudou. Enquanto o servidor está no ar o banco fica travado para
+# gravação; para ver dados novos, reinicie o servidor.
+import asyncio
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from acidentes.agregacao import CUBO, DIMENSOES, DIMENSOES_OCUPACAO, TABELA, contar, top_n
+from acidentes.categorias import nome_municipio
+from acidentes.ocupacoes import OCUPACOES
+
+LIMITE_CACHE = 512
+
+# Dimensões que podem ser pedidas em /api/contagens (NU_ANO sempre vem)
+DIMENSOES_API = [d for d in [*DIMENSOES, *DIMENSOES_OCUPACAO] if d != 'NU_ANO']
+
+STATUS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+def _lista(parametros, nome, tipo=str):
+    valor = parametros.get(nome)
+    if not valor:
+        return None
+    try:
+        return [tipo(item) for item in valor.split(',') if item]
+    except ValueError:
+        raise ValueError(f'Valor inválido em {nome}: {valor!r}') from None
+
+
+def _inteiro(parametros, nome, padrao=None):
+    valores = _lista(parametros, nome, int)
+    return valores[0] if valores else padrao
+
+
+# LookupError (404) se a tabela não existir na conexão
+def _exigir(conn, tabela, mensagem):
+    import duckdb
+
+    try:
+        conn.execute(f'SELECT 1 FROM {tabela} LIMIT 0')
+    except duckdb.CatalogException:
+        raise LookupError(mensagem) from None
+
+
+def _filtros(conn, parametros):
+    fonte = parametros.get('fonte', 'bruto')
+    if fonte not in ('bruto', 'cubo'):
+        raise ValueError(f"Fonte desconhecida: {fonte!r} (use 'bruto' ou 'cubo')")
+    if fonte == 'cubo':
+        _exigir(conn, CUBO, 'O cubo de contagens não existe neste banco; rode um relatório com --fonte cubo ou use fonte=bruto')
+    anos = _lista(parametros, 'anos', int) or _anos(conn, parametros)
+    return anos, _lista(parametros, 'municipios', int), _inteiro(parametros, 'uf'), fonte
+
+
+def _exigir_ocupacoes(conn):
+    _exigir(conn, OCUPACOES, 'A tabela de ocupações não foi carregada; inicie o servidor com --ocupacoes OCUPANET.csv')
+
+
+def _anos(conn, parametros):
+    return [ano for (ano,) in conn.execute(f'SELECT DISTINCT NU_ANO FROM {TABELA} WHERE NU_ANO IS NOT NULL ORDER BY 1').fetchall()]
+
+
+def _municipios(conn, parametros):
+    anos, municipios, uf, fonte = _filtros(conn, parametros)
+    contagem = contar(conn, ['ID_MUNICIP'], anos, municipios, uf, fonte).groupby('ID_MUNICIP')['QTD'].sum()
+    return [{'codigo': int(codigo), 'nome': nome_municipio(codigo), 'qtd': int(qtd)} for codigo, qtd in contagem.items()]
+
+
+def _contagens(conn, parametros):
+    dimensoes = _lista(parametros, 'dimensoes') or ['ID_MUNICIP']
+    desconhecidas = [d for d in dimensoes if d not in DIMENSOES_API]
+    if desconhecidas:
+        raise ValueError(f"Dimensões desconhecidas: {', '.join(desconhecidas)} (use {', '.join(DIMENSOES_API)})")
+    filtros = _filtros(conn, parametros)
+    if any(d in DIMENSOES_OCUPACAO for d in dimensoes):
+        _exigir_ocupacoes(conn)
+    return contar(conn, dimensoes, *filtros)
+
+
+def _top_cargos(conn, parametros):
+    anos, municipios, uf, fonte = _filtros(conn, parametros)
+    grupos = ['NU_ANO', *(_lista(parametros, 'por') or [])]
+    desconhecidos = [g for g in grupos if g not in DIMENSOES]
+    if desconhecidos:
+        raise ValueError(f"Grupos desconhecidos: {', '.join(desconhecidos)}")
+    _exigir_ocupacoes(conn)
+    return top_n(conn, 'CARGO', grupos, anos, municipios, uf, _inteiro(parametros, 'n', 10), fonte)
+
+
+# Caminho -> função (conexão, parâmetros) que devolve um DataFrame ou algo serializável em JSON
+ROTAS = {
+    '/api/anos': _anos,
+    '/api/municipios': _municipios,
+    '/api/contagens': _contagens,
+    '/api/top-cargos': _top_cargos,
+}
+
+
+# DataFrames vão no formato 'split' ({"columns": [...], "data": [[...], ...]}),
+# bem menor que uma lista de objetos
+def _json(resultado):
+    if hasattr(resultado, 'to_json'):
+        return resultado.to_json(orient='split', index=False).encode()
+    return json.dumps(resultado, ensure_ascii=False).encode()
+
+
+def _etag(corpo):
+    return '"' + hashlib.sha256(corpo).hexdigest()[:32] + '"'
+
+
+def _resposta(status, corpo, tipo='application/json; charset=utf-8', etag=None):
+    return {'status': status, 'corpo': corpo, 'tipo': tipo, 'etag': etag, 'gzip': None}
+
+
+def _erro(status, mensagem):
+    return _resposta(status, _json({'erro': mensagem}))
+
+
+# Roda a consulta numa thread, com um cursor próprio da conexão compartilhada.
+# O cursor é outra conexão ao mesmo banco e não enxerga tabelas temporárias,
+# então as ocupações são registradas nele a cada consulta (sem cópia).
+def _executar_rota(conn, rota, parametros, ocupacoes=None):
+    cursor = conn.cursor()
+    if ocupacoes is not None:
+        cursor.register(OCUPACOES, ocupacoes)
+    try:
+        corpo = _json(ROTAS[rota](cursor, parametros))
+    finally:
+        cursor.close()
+    return _resposta(200, corpo, etag=_etag(corpo))
+
+
+async def _api(estado, rota, parametros):
+    chave = (rota, tuple(sorted(parametros.items())))
+    cache = estado['cache']
+    if chave in cache:
+        cache.move_to_end(chave)
+        return cache[chave]
+
+    # pedidos iguais feitos enquanto a consulta roda esperam a mesma consulta
+    pendente = estado['pendentes'].get(chave)
+    if pendente is None:
+        pendente = asyncio.get_running_loop().run_in_executor(
+            None, _executar_rota, estado['conn'], rota, parametros, estado['ocupacoes']
+        )
+        estado['pendentes'][chave] = pendente
+        pendente.add_done_callback(lambda _: estado['pendentes'].pop(chave, None))
+    try:
+        resposta = await asyncio.shield(pendente)
+    except ValueError as e:
+        return _erro(400, str(e))
+    except LookupError as e:
+        return _erro(404, str(e))
+    except Exception as e:
+        return _erro(500, f'{type(e).__name__}: {e}')
+
+    cache[chave] = resposta
+    while len(cache) > LIMITE_CACHE:
+        cache.popitem(last=False)
+    return resposta
+
+
+# Arquivos do painel; / é o painel interativo
+def _estatico(estado, caminho):
+    relativo = unquote(caminho).lstrip('/') or 'interativo.html'
+    raiz = os.path.realpath(estado['painel'])
+    arquivo = os.path.realpath(os.path.join(raiz, relativo))
+    if os.path.commonpath([raiz, arquivo]) != raiz or not os.path.isfile(arquivo):
+        return _erro(404, f'Não encontrado: {caminho}')
+    info = os.stat(arquivo)
+    with open(arquivo, 'rb') as entrada:
+        corpo = entrada.read()
+    tipo = mimetypes.guess_type(arquivo)[0] or 'application/octet-stream'
+    if tipo.startswith('text/') or tipo == 'application/javascript':
+        tipo += '; charset=utf-8'
+    return _resposta(200, corpo, tipo, etag=f'"{info.st_mtime_ns:x}-{info.st_size:x}"')
+
+
+async def _responder(estado, metodo, alvo):
+    if metodo not in ('GET', 'HEAD'):
+        return _erro(405, f'Método não suportado: {metodo}')
+    partes = urlsplit(alvo)
+    if partes.path.startswith('/api/'):
+        if partes.path not in ROTAS:
+            return _erro(404, f"Rota desconhecida: {partes.path} (use {', '.join(ROTAS)})")
+        parametros = {nome: valores[-1] for nome, valores in parse_qs(partes.query).items()}
+        return await _api(estado, partes.path, parametros)
+    return _estatico(estado, partes.path)
+
+
+def _cabecalhos_resposta(resposta, cabecalhos, manter):
+    status, corpo, etag = resposta['status'], resposta['corpo'], resposta['etag']
+    extras = {}
+    if len(corpo) > 1024 and 'gzip' in cabecalhos.get('accept-encoding', ''):
+        if resposta['gzip'] is None:
+            resposta['gzip'] = gzip.compress(corpo, compresslevel=5)
+        corpo = resposta['gzip']
+        extras['Content-Encoding'] = 'gzip'
+        # cada codificação tem o seu ETag
+        etag = etag and etag[:-1] + '-gz"'
+    if etag:
+        extras['ETag'] = etag
+        # o navegador guarda a resposta, mas revalida pelo ETag a cada uso
+        extras['Cache-Control'] = 'no-cache'
+        extras['Vary'] = 'Accept-Encoding'
+        if etag in [e.strip() for e in cabecalhos.get('if-none-match', '').split(',')]:
+            status, corpo = 304, b''
+    linhas = [f'HTTP/1.1 {status} {STATUS[status]}', f"Content-Type: {resposta['tipo']}", f'Content-Length: {len(corpo)}',
+              *(f'{nome}: {valor}' for nome, valor in extras.items()), f"Connection: {'keep-alive' if manter else 'close'}"]
+    return ('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1'), corpo
+
+
+# Uma conexão TCP: lê pedidos em sequência (keep-alive do HTTP/1.1) até o
+# cliente fechar ou pedir Connection: close
+async def _atender(estado, leitor, escritor):
+    try:
+        while True:
+            linha = await leitor.readline()
+            if not linha.strip():
+                break
+            metodo, alvo, versao = linha.decode('latin-1').split()
+            cabecalhos = {}
+            while (linha := await leitor.readline()).strip():
+                nome, _, valor = linha.decode('latin-1').partition(':')
+                cabecalhos[nome.strip().lower()] = valor.strip()
+            # pedidos com corpo não são aceitos; a conexão é fechada depois da resposta
+            com_corpo = int(cabecalhos.get('content-length', 0) or 0) > 0
+            manter = versao == 'HTTP/1.1' and cabecalhos.get('connection', '').lower() != 'close' and not com_corpo
+
+            resposta = await _responder(estado, metodo, alvo)
+            cabecalho, corpo = _cabecalhos_resposta(resposta, cabecalhos, manter)
+            escritor.write(cabecalho if metodo == 'HEAD' else cabecalho + corpo)
+            await escritor.drain()
+            if not manter:
+                break
+    except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        escritor.close()
+
+
+# Atende até ser interrompido. `conn` deve ser só de leitura (ou em memória,
+# sobre a exportação em Parquet); ao_iniciar recebe o endereço de cada socket.
+# ocupacoes: DataFrame de ocupacoes.ler_ocupacoes, que substitui a tabela do
+# banco (se houver) nas consultas de cargos.
+async def servir(conn, painel, host='127.0.0.1', porta=8000, ao_iniciar=print, ocupacoes=None):
+    estado = {'conn': conn, 'painel': painel, 'cache': OrderedDict(), 'pendentes': {}, 'ocupacoes': ocupacoes}
+    servidor = await asyncio.start_server(lambda leitor, escritor: _atender(estado, leitor, escritor), host, porta)
+    if ao_iniciar:
+        for socket in servidor.sockets:
+            endereco = socket.getsockname()
+            ao_iniciar(f'http://{endereco[0]}:{endereco[1]}/')
+    async with servidor:
+        await servidor.serve_forever()
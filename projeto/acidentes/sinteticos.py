@@ -0,0 +1,215 @@
+# Gerador de dados sintéticos no formato dos CSVs ACGRBR / da tabela
+# dadosacidentetrabalho, para benchmarks e testes sem a base real (que não cabe
+# no repositório). As distribuições imitam a base: municípios com tamanhos
+# desiguais (Zipf) dentro de cada UF, CIDs concentrados em forças mecânicas,
+# quedas e material biológico, idades em idade ativa e ocupações do OCUPANET.
+# Os dados são gerados em lotes, então dá para gerar dezenas de milhões de
+# linhas sem ter tudo em memória.
+import os
+
+import numpy as np
+import pandas as pd
+
+from acidentes.agregacao import TABELA
+from acidentes.idade import ANOS, DIAS, MESES
+from acidentes.ocupacoes import ler_ocupacoes
+
+# UF (código IBGE): (quantidade de municípios, população em milhões)
+UFS = {
+    11: (52, 1.6), 12: (22, 0.8), 13: (62, 3.9), 14: (15, 0.6), 15: (144, 8.1),
+    16: (16, 0.7), 17: (139, 1.5), 21: (217, 6.8), 22: (224, 3.3), 23: (184, 8.8),
+    24: (167, 3.3), 25: (223, 4.0), 26: (185, 9.1), 27: (102, 3.1), 28: (75, 2.2),
+    29: (417, 14.1), 31: (853, 20.5), 32: (78, 3.8), 33: (92, 16.1), 35: (645, 44.4),
+    41: (399, 11.4), 42: (295, 7.6), 43: (497, 10.9), 50: (79, 2.8), 51: (141, 3.7),
+    52: (246, 7.1), 53: (1, 2.8),
+}
+
+# Posição, no ranking de tamanho do RS, dos municípios analisados no trabalho
+POSICOES_ANALISADOS = {431410: 10, 431020: 25, 431390: 50}
+
+# Faixas de CID (primeiro e último código de três caracteres) e seu peso.
+# Códigos de quatro caracteres são fixos; peso restante fica com CIDs fora da
+# tabela de tipos_acidentes e com valores ausentes.
+CIDS = [
+    ('Z209', 'Z209', 0.15),
+    ('W20', 'W49', 0.30),
+    ('W00', 'W19', 0.14),
+    ('V20', 'V29', 0.08),
+    ('V01', 'V09', 0.01),
+    ('V10', 'V19', 0.01),
+    ('V30', 'V49', 0.03),
+    ('V80', 'V89', 0.02),
+    ('W50', 'W64', 0.03),
+    ('W85', 'W99', 0.01),
+    ('X00', 'X19', 0.03),
+    ('X30', 'X33', 0.01),
+    ('X40', 'X46', 0.01),
+    ('X60', 'X84', 0.005),
+    ('X85', 'Y09', 0.04),
+    ('Y10', 'Y34', 0.01),
+    ('Y85', 'Y89', 0.005),
+    ('Y96', 'Y96', 0.02),
+    ('S00', 'T98', 0.02),
+]
+CID_AUSENTE = 0.03
+IDADE_AUSENTE = 0.01
+OCUPACAO_AUSENTE = 0.05
+
+
+def _codigo_para_numero(codigo):
+    return (ord(codigo[0]) - ord('A')) * 100 + int(codigo[1:3])
+
+
+def _numero_para_codigo(numeros):
+    letras = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))[numeros // 100]
+    return np.char.add(letras, np.char.zfill((numeros % 100).astype(str), 2))
+
+
+def _zipf(n, rng, expoente=1.0):
+    pesos = 1.0 / np.arange(1, n + 1) ** expoente
+    return rng.permutation(pesos / pesos.sum())
+
+
+# Códigos de município (6 dígitos, como no DATASUS) e a probabilidade de cada um
+def municipios_e_pesos(rng):
+    codigos, pesos = [], []
+    total = sum(populacao for _, populacao in UFS.values())
+    for uf, (quantidade, populacao) in UFS.items():
+        codigos_uf = uf * 10000 + 10 * np.arange(1, quantidade + 1)
+        pesos_uf = _zipf(quantidade, rng)
+        if uf == 43:
+            # os municípios analisados ficam em posições fixas do ranking
+            ordem = np.sort(pesos_uf)[::-1]
+            for codigo, posicao in POSICOES_ANALISADOS.items():
+                i = np.flatnonzero(codigos_uf == codigo)[0]
+                j = np.flatnonzero(pesos_uf == ordem[posicao - 1])[0]
+                pesos_uf[i], pesos_uf[j] = pesos_uf[j], pesos_uf[i]
+        codigos.append(codigos_uf)
+        pesos.append(pesos_uf * populacao / total)
+    return np.concatenate(codigos), np.concatenate(pesos)
+
+
+def gerar_cids(n, rng):
+    pesos = np.array([peso for _, _, peso in CIDS] + [CID_AUSENTE])
+    faixa = rng.choice(len(pesos), size=n, p=pesos / pesos.sum())
+
+    inicio = np.array([_codigo_para_numero(i) for i, _, _ in CIDS] + [0])
+    fim = np.array([_codigo_para_numero(f) for _, f, _ in CIDS] + [0])
+    numeros = inicio[faixa] + (rng.random(n) * (fim[faixa] - inicio[faixa] + 1)).astype(int)
+
+    # quarto caractere em 80% dos códigos; os de quatro caracteres fixos ficam como estão
+    cids = _numero_para_codigo(numeros).astype(object)
+    com_subcategoria = rng.random(n) < 0.8
+    cids[com_subcategoria] = cids[com_subcategoria] + rng.integers(0, 10, com_subcategoria.sum()).astype(str)
+    for i, (codigo, _, _) in enumerate(CIDS):
+        if len(codigo) == 4:
+            cids[faixa == i] = codigo
+    cids[faixa == len(CIDS)] = None
+    return cids
+
+
+# Idade codificada como no NU_IDADE_N: maioria em idade ativa (em anos), poucos
+# menores de idade e raros registros em meses ou dias
+def gerar_idades(n, rng):
+    anos = np.clip(np.rint(rng.normal(36, 12, n)), 14, 80).astype(np.int16)
+    menores = rng.random(n) < 0.03
+    anos[menores] = rng.integers(10, 18, menores.sum())
+    codigos = pd.array(ANOS * 1000 + anos, dtype='Int16')
+
+    sorteio = rng.random(n)
+    meses = sorteio < 0.0005
+    codigos[meses] = MESES * 1000 + rng.integers(1, 12, meses.sum())
+    dias = (sorteio >= 0.0005) & (sorteio < 0.0008)
+    codigos[dias] = DIAS * 1000 + rng.integers(1, 30, dias.sum())
+    codigos[rng.random(n) < IDADE_AUSENTE] = pd.NA
+    return codigos
+
+
+# Datas de notificação no ano, com menos notificações nos fins de semana
+def gerar_datas(n, ano, rng):
+    dias = pd.date_range(f'{ano}-01-01', f'{ano}-12-31', freq='D')
+    pesos = np.where(dias.dayofweek >= 5, 0.4, 1.0)
+    return dias[rng.choice(len(dias), size=n, p=pesos / pesos.sum())]
+
+
+# Gera n linhas de um ano no formato dos CSVs ACGRBR
+def gerar_lote(n, ano, rng, municipios, pesos_municipios, ocupacoes, pesos_ocupacoes):
+    id_municip = rng.choice(municipios, size=n, p=pesos_municipios)
+
+    ocupacao = rng.choice(ocupacoes, size=n, p=pesos_ocupacoes).astype(object)
+    ocupacao[rng.random(n) < OCUPACAO_AUSENTE] = None
+
+    return pd.DataFrame({
+        'NU_ANO': pd.array(np.full(n, ano), dtype='Int16'),
+        'DT_NOTIFIC': gerar_datas(n, ano, rng),
+        'SG_UF_NOT': id_municip // 10000,
+        'ID_MUNICIP': pd.array(id_municip, dtype='Int32'),
+        'CS_SEXO': rng.choice(np.array(['M', 'F', 'I']), size=n, p=[0.7, 0.295, 0.005]),
+        'NU_IDADE_N': gerar_idades(n, rng),
+        'ID_OCUPA_N': ocupacao,
+        'CID_ACID': gerar_cids(n, rng),
+    })
+
+
+# Gera `linhas` registros divididos igualmente entre os anos, em lotes de até
+# tamanho_lote linhas. Devolve um gerador de (ano, DataFrame).
+def gerar_lotes(linhas, anos, caminho_ocupacoes, semente=0, tamanho_lote=1_000_000):
+    rng = np.random.default_rng(semente)
+    municipios, pesos_municipios = municipios_e_pesos(rng)
+    ocupacoes = ler_ocupacoes(caminho_ocupacoes)['CODIGO'].to_numpy()
+    pesos_ocupacoes = _zipf(len(ocupacoes), rng, expoente=1.1)
+
+    anos = list(anos)
+    for i, ano in enumerate(anos):
+        restantes = linhas // len(anos) + (i < linhas % len(anos))
+        while restantes > 0:
+            n = min(tamanho_lote, restantes)
+            yield ano, gerar_lote(n, ano, rng, municipios, pesos_municipios, ocupacoes, pesos_ocupacoes)
+            restantes -= n
+
+
+# Tabela de referência (referencia.py) dos municípios sintéticos: a população
+# segue o mesmo peso que cada município tem nos acidentes gerados com a mesma
+# semente; área e PIB por habitante são sorteados. Grava em `caminho` e o devolve.
+def gerar_referencia(caminho, semente=0):
+    rng = np.random.default_rng(semente)
+    municipios, pesos = municipios_e_pesos(rng)
+    populacao = np.rint(pesos * sum(populacao for _, populacao in UFS.values()) * 1_000_000).astype(np.int64)
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    pd.DataFrame({
+        'ID_MUNICIP': municipios,
+        'POPULACAO': populacao,
+        'AREA_KM2': rng.lognormal(np.log(400), 1.0, len(municipios)).round(1),
+        'PIB': (populacao * rng.lognormal(np.log(40_000), 0.4, len(municipios))).round(-3).astype(np.int64),
+    }).to_csv(caminho, index=False)
+    return caminho
+
+
+# Grava um CSV por ano. `caminho` deve conter {ano}, ex.: 'banco/ACGRBR{ano}.csv'
+# (o ano é escrito com dois dígitos, como nos arquivos do DATASUS).
+# Devolve {ano: caminho do arquivo}.
+def gerar_csv(caminho, linhas, anos, caminho_ocupacoes, semente=0, tamanho_lote=1_000_000):
+    arquivos = {}
+    for ano, lote in gerar_lotes(linhas, anos, caminho_ocupacoes, semente, tamanho_lote):
+        destino = caminho.format(ano=str(ano)[-2:])
+        novo = ano not in arquivos
+        if novo:
+            os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+        lote.to_csv(destino, mode='w' if novo else 'a', header=novo, index=False, date_format='%Y-%m-%d')
+        arquivos[ano] = destino
+    return arquivos
+
+
+# Grava os dados gerados na tabela dadosacidentetrabalho (substituindo a que
+# existir) e devolve a quantidade de linhas
+def gerar_banco(conn, linhas, anos, caminho_ocupacoes, semente=0, tamanho_lote=1_000_000):
+    total = 0
+    for ano, lote in gerar_lotes(linhas, anos, caminho_ocupacoes, semente, tamanho_lote):
+        conn.register('lote_sintetico', lote)
+        if total == 0:
+            conn.execute(f'CREATE OR REPLACE TABLE {TABELA} AS SELECT * FROM lote_sintetico')
+        else:
+            conn.execute(f'INSERT INTO {TABELA} SELECT * FROM lote_sintetico')
+        conn.unregister('lote_sintetico')
+        total += len(lote)
+    return total
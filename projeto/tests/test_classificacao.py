@@ -0,0 +1,82 @@
+# O classificador compilado (busca binária nas fronteiras) deve dar os mesmos
+# rótulos que o laço original de classificar_acidente, que percorre
+# tipos_acidentes e devolve a primeira entrada que cobre o CID
+import numpy as np
+import pandas as pd
+import pytest
+
+from acidentes.categorias import tipos_acidentes
+from acidentes.classificacao import classificar_acidentes, compilar_classificador
+
+
+def _classificar_acidente(cid, tabela=tipos_acidentes):
+    if pd.isna(cid):
+        return 'Outros'
+    cid = str(cid)
+    for codigo, descricao in tabela.items():
+        if '-' in codigo:
+            inicio, fim = codigo.split('-')
+            if inicio <= cid <= fim:
+                return descricao
+        elif cid == codigo:
+            return descricao
+    return 'Outros'
+
+
+# Cada limite da tabela, os códigos vizinhos e subcódigos de quatro caracteres
+def _codigos_de_fronteira(tabela=tipos_acidentes):
+    codigos = set()
+    for codigo in tabela:
+        for limite in codigo.split('-'):
+            letra, numero = limite[0], int(limite[1:3])
+            for vizinho in (numero - 1, numero, numero + 1):
+                if 0 <= vizinho <= 99:
+                    codigos.update({f'{letra}{vizinho:02d}', f'{letra}{vizinho:02d}0', f'{letra}{vizinho:02d}9'})
+            codigos.add(limite)
+    return sorted(codigos | {'A00', 'U99', 'V', 'W', 'Z99', 'Z2', 'Z2090', '', '0', 'w01'})
+
+
+def test_fronteiras_iguais_ao_laco_original():
+    codigos = _codigos_de_fronteira()
+    esperado = [_classificar_acidente(codigo) for codigo in codigos]
+    assert list(classificar_acidentes(pd.Series(codigos))) == esperado
+    assert list(classificar_acidentes.rotular(codigos)) == esperado
+
+
+@pytest.mark.parametrize('cid, rotulo', [
+    ('V01', 'Pedestres (veículos)'),
+    ('V09', 'Pedestres (veículos)'),
+    ('V10', 'Ciclistas'),
+    ('V50', 'Outros'),
+    ('W19', 'Quedas'),
+    ('W20', 'Forças mecânicas'),
+    ('X30', 'Calor excessivo'),
+    ('X32', 'Outros'),
+    ('Y96', 'Grave/Fatal/Crianças'),
+    ('Z209', 'Exp. Material Biológico'),
+    ('Z20', 'Outros'),
+])
+def test_rotulos_conhecidos(cid, rotulo):
+    assert classificar_acidentes(pd.Series([cid])).iloc[0] == rotulo
+
+
+def test_entrada_categorica_com_ausentes():
+    codigos = pd.Series(['W01', None, 'Z209', 'W01', np.nan, 'Q99'], dtype='category', name='CID_ACID', index=[5, 4, 3, 2, 1, 0])
+    resultado = classificar_acidentes(codigos)
+    assert resultado.name == 'CID_ACID'
+    assert list(resultado.index) == list(codigos.index)
+    assert list(resultado) == [_classificar_acidente(codigo) for codigo in codigos]
+
+
+def test_entrada_vazia():
+    resultado = classificar_acidentes(pd.Series([], dtype='category'))
+    assert resultado.empty
+
+
+def test_primeira_entrada_da_tabela_vence():
+    tabela = {'B10-B20': 'Largo', 'B15': 'Exato', 'B12-B13': 'Dentro', 'A50-C00': 'Amplo'}
+    classificar = compilar_classificador(tabela, padrao='Nenhum')
+    codigos = ['A49', 'A50', 'B09', 'B10', 'B12', 'B13', 'B15', 'B20', 'B21', 'C00', 'C01']
+    esperado = [_classificar_acidente(codigo, tabela) for codigo in codigos]
+    esperado = ['Nenhum' if rotulo == 'Outros' else rotulo for rotulo in esperado]
+    assert list(classificar(pd.Series(codigos))) == esperado
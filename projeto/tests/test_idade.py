@@ -0,0 +1,76 @@
+# Decodificação do NU_IDADE_N (unidade no primeiro dígito) e faixas etárias
+# com os mesmos limites de categorias.faixas_etarias
+import numpy as np
+import pandas as pd
+import pytest
+
+from acidentes.categorias import faixas_etarias
+from acidentes.idade import atribuir_faixas, decodificar_idade, faixa_etaria_da_coluna
+
+
+def _faixa_etaria(idade):
+    if idade < 18:
+        return '<18'
+    elif 18 <= idade <= 25:
+        return '18-25'
+    elif 26 <= idade <= 35:
+        return '26-35'
+    elif 36 <= idade <= 50:
+        return '36-50'
+    else:
+        return '>50'
+
+
+@pytest.mark.parametrize('codigo, idade', [
+    (1005, 0),      # horas
+    (2010, 0),      # dias
+    (3006, 0),      # meses
+    (3011, 0),
+    (3012, 1),
+    (3030, 2),
+    (4000, 0),      # anos
+    (4025, 25),
+    (4099, 99),
+    (5000, 100),    # anos acima de 100
+    (5003, 103),
+])
+def test_unidades(codigo, idade):
+    assert decodificar_idade(pd.Series([codigo])).iloc[0] == idade
+
+
+@pytest.mark.parametrize('codigo', [0, 25, 999, 6001, 9025, -4025, None, np.nan, 'abc', ''])
+def test_codigos_invalidos(codigo):
+    assert decodificar_idade(pd.Series([codigo], dtype=object)).isna().all()
+
+
+def test_tipos_de_entrada():
+    esperado = pd.Series([25, 1, pd.NA], name='IDADE', dtype='Int16', index=[7, 8, 9])
+    for codigos in (
+        pd.Series([4025, 3012, None], dtype='Int16', index=[7, 8, 9]),
+        pd.Series([4025.0, 3012.0, np.nan], index=[7, 8, 9]),
+        pd.Series(['4025', '3012', None], index=[7, 8, 9]),
+    ):
+        pd.testing.assert_series_equal(decodificar_idade(codigos), esperado)
+
+
+def test_limites_das_faixas():
+    idades = pd.Series(range(0, 121), dtype='Int16')
+    faixas = atribuir_faixas(idades)
+    assert faixas.name == 'FAIXA_ETARIA'
+    assert list(faixas.cat.categories) == [rotulo for rotulo, _ in faixas_etarias]
+    assert faixas.cat.ordered
+    assert list(faixas.astype(str)) == [_faixa_etaria(idade) for idade in range(0, 121)]
+
+
+def test_faixas_de_idades_ausentes():
+    faixas = atribuir_faixas(pd.Series([17, pd.NA, 18], dtype='Int16'))
+    assert faixas.iloc[0] == '<18'
+    assert pd.isna(faixas.iloc[1])
+    assert faixas.iloc[2] == '18-25'
+
+
+def test_faixas_da_coluna():
+    codigos = pd.Series([4017, 4018, 4025, 4026, 4035, 4036, 4050, 4051, 3030, 5001, 9999])
+    faixas = faixa_etaria_da_coluna(codigos)
+    assert list(faixas.iloc[:-1]) == ['<18', '18-25', '18-25', '26-35', '26-35', '36-50', '36-50', '>50', '<18', '>50']
+    assert pd.isna(faixas.iloc[-1])
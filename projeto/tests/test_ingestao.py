@@ -0,0 +1,41 @@
+# A leitura em blocos deve devolver as mesmas linhas, colunas e tipos que a
+# leitura do arquivo inteiro
+import os
+
+import pandas as pd
+import pytest
+
+from acidentes import sinteticos
+from acidentes.ingestao import COLUNAS, carregar_csv, ler_csv_em_blocos
+
+OCUPACOES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'OCUPANET.csv')
+LINHAS = 10_000
+
+
+@pytest.fixture(scope='module')
+def csv(tmp_path_factory):
+    pasta = tmp_path_factory.mktemp('ingestao')
+    return sinteticos.gerar_csv(str(pasta / 'ACGRBR{ano}.csv'), LINHAS, [2022], OCUPACOES)[2022]
+
+
+@pytest.mark.parametrize('tamanho_bloco', [7, 999, 4_096, LINHAS, LINHAS * 2])
+def test_blocos_iguais_ao_arquivo_inteiro(csv, tamanho_bloco):
+    inteiro = carregar_csv(csv)
+    with ler_csv_em_blocos(csv, tamanho_bloco) as leitor:
+        blocos = list(leitor)
+    assert len(blocos) == -(-LINHAS // tamanho_bloco)
+    assert all(len(bloco) <= tamanho_bloco for bloco in blocos)
+    for bloco in blocos:
+        assert list(bloco.columns) == list(inteiro.columns)
+        assert dict(bloco.dtypes.astype(str)) == dict(inteiro.dtypes.astype(str))
+
+    # as categorias de cada bloco são só as que aparecem nele
+    juntos = pd.concat(blocos).astype({coluna: object for coluna, tipo in COLUNAS.items() if tipo == 'category'})
+    pd.testing.assert_frame_equal(juntos, inteiro.astype(juntos.dtypes.to_dict()))
+
+
+def test_colunas_e_tipos(csv):
+    dados = carregar_csv(csv)
+    assert dict(dados.dtypes.astype(str)) == COLUNAS
+    assert len(dados) == LINHAS
+    assert dados['CID_ACID'].isna().any()
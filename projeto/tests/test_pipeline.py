@@ -0,0 +1,99 @@
+# As contagens de pipeline.py devem ser as mesmas em todos os backends: os
+# mesmos dados sintéticos gravados em CSV, no banco e em Parquet, lidos pelo
+# pandas (inteiros ou em blocos) e pelo DuckDB
+import os
+
+import duckdb
+import pandas as pd
+import pytest
+
+from acidentes import pipeline, sinteticos
+from acidentes.parquet import exportar_parquet
+
+OCUPACOES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'OCUPANET.csv')
+ANOS = [2021, 2022]
+LINHAS = 20_000
+
+
+@pytest.fixture(scope='module')
+def entradas(tmp_path_factory):
+    pasta = tmp_path_factory.mktemp('sinteticos')
+    csvs = sinteticos.gerar_csv(str(pasta / 'ACGRBR{ano}.csv'), LINHAS, ANOS, OCUPACOES, tamanho_lote=3_000)
+    banco = str(pasta / 'sinteticos.db')
+    conn = duckdb.connect(banco)
+    sinteticos.gerar_banco(conn, LINHAS, ANOS, OCUPACOES, tamanho_lote=3_000)
+    exportar_parquet(conn, str(pasta / 'parquet'))
+    conn.close()
+    return {'pandas': csvs, 'csv': csvs, 'banco': banco, 'parquet': str(pasta / 'parquet')}
+
+
+def _iguais(esperadas, obtidas):
+    assert set(obtidas) == set(pipeline.TABELAS)
+    for nome in pipeline.TABELAS:
+        pd.testing.assert_frame_equal(esperadas[nome], obtidas[nome], check_dtype=False, check_index_type=False,
+                                      check_column_type=False, check_categorical=False, obj=nome)
+
+
+def _municipios(entradas, quantidade):
+    tabela = pipeline.executar(entradas['banco'], ANOS, backend='banco')['municipios']
+    return tabela.sum(axis=1).nlargest(quantidade).index.tolist()
+
+
+@pytest.mark.parametrize('backend', ['csv', 'banco', 'parquet'])
+def test_backends_iguais_ao_pandas(entradas, backend):
+    esperadas = pipeline.executar(entradas['pandas'], ANOS, backend='pandas')
+    assert esperadas['municipios'].to_numpy().sum() > 0
+    _iguais(esperadas, pipeline.executar(entradas[backend], ANOS, backend=backend))
+
+
+@pytest.mark.parametrize('backend', pipeline.BACKENDS)
+def test_backends_com_filtros(entradas, backend):
+    municipios = _municipios(entradas, 3)
+    esperadas = pipeline.executar(entradas['banco'], [2022], municipios, backend='banco')
+    assert sorted(esperadas['municipios'].index) == sorted(municipios)
+    _iguais(esperadas, pipeline.executar(entradas[backend], [2022], municipios, backend=backend))
+
+    uf = municipios[0] // 10000
+    esperadas = pipeline.executar(entradas['banco'], ANOS, uf=uf, backend='banco')
+    assert (esperadas['municipios'].index // 10000 == uf).all()
+    _iguais(esperadas, pipeline.executar(entradas[backend], ANOS, uf=uf, backend=backend))
+
+
+@pytest.mark.parametrize('tamanho_bloco', [1_000, 7_777, LINHAS])
+def test_leitura_em_blocos_igual_a_inteira(entradas, tamanho_bloco):
+    inteira = pipeline.executar(entradas['pandas'], ANOS, backend='pandas')
+    _iguais(inteira, pipeline.executar(entradas['pandas'], ANOS, backend='pandas', tamanho_bloco=tamanho_bloco))
+
+
+@pytest.mark.parametrize('backend', pipeline.BACKENDS)
+@pytest.mark.parametrize('tamanho_bloco', [None, 1_000])
+def test_resultado_vazio(entradas, backend, tamanho_bloco):
+    if tamanho_bloco and backend != 'pandas':
+        pytest.skip('tamanho_bloco vale só para o pandas')
+    tabelas = pipeline.executar(entradas[backend], ANOS, [999999], backend=backend, tamanho_bloco=tamanho_bloco)
+    assert set(tabelas) == set(pipeline.TABELAS)
+    for tabela in tabelas.values():
+        assert tabela.empty
+
+
+def test_comparar_backends(entradas):
+    resultado = pipeline.comparar_backends(entradas, ANOS)
+    assert list(resultado) == pipeline.BACKENDS
+    assert all(not medida['diferencas'] for medida in resultado.values())
+
+
+def test_comparar_backends_aponta_diferenca(entradas, tmp_path):
+    banco = str(tmp_path / 'outro.db')
+    conn = duckdb.connect(banco)
+    sinteticos.gerar_banco(conn, LINHAS, ANOS, OCUPACOES, semente=1)
+    conn.close()
+    resultado = pipeline.comparar_backends({'pandas': entradas['pandas'], 'banco': banco}, ANOS)
+    assert not resultado['pandas']['diferencas']
+    assert set(resultado['banco']['diferencas']) == set(pipeline.TABELAS)
+
+
+def test_backend_incompativel(entradas):
+    with pytest.raises(ValueError):
+        pipeline.executar(entradas['banco'], ANOS, backend='pandas')
+    with pytest.raises(ValueError):
+        pipeline.executar(entradas['pandas'], ANOS, backend='banco')